@@ -6,60 +6,64 @@
 """
 
 import os
+import re
 import sys
 import json
 import uuid
+import hashlib
+import queue
 import shutil
 import logging
 import threading
-import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
-from flask import Flask, request, jsonify, send_file, abort
+from flask import Flask, Response, request, jsonify, send_file, abort
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
-from werkzeug.routing import PathConverter
+from werkzeug.http import parse_options_header
+
+# 优先使用orjson序列化JSON响应，直接输出UTF-8字节
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
 
 # 添加当前目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # 导入处理模块
-from convert_doc_to_md import convert_file_to_md
+from convert_doc_to_md import convert_file_to_md, init_converter, file_sha256
 from text_chunker import process_all_documents
 from merge_json_files import merge_document_data
+# 服务目录及残留文件清理（gunicorn master进程只导入该模块）
+from cleanup import (
+    LOG_FORMAT, BASE_DIR, UPLOAD_FOLDER, PROCESSED_FOLDER, TEMP_FOLDER, HASH_CACHE_FOLDER,
+    TASK_STATUS_FILENAME, rmtree_fast, start_cleanup_thread
+)
 
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format=LOG_FORMAT
 )
 logger = logging.getLogger(__name__)
 
 # Flask应用配置
-class ChinesePathConverter(PathConverter):
-    """支持中文字符的路径转换器"""
-    pass
-
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 限制上传文件大小为50MB
-# 注册自定义路径转换器
-app.url_map.converters['chinese_path'] = ChinesePathConverter
 # 禁用JSON的Unicode转义，直接显示中文字符
 app.config['JSON_AS_ASCII'] = False
-
-# 服务配置
-BASE_DIR = Path(__file__).parent
-UPLOAD_FOLDER = BASE_DIR / "uploads"
-PROCESSED_FOLDER = BASE_DIR / "processed"
-TEMP_FOLDER = BASE_DIR / "temp"
-CONVERTED_FOLDER = BASE_DIR / "converted_data"
-SLICED_FOLDER = BASE_DIR / "sliced_data"
-MERGED_FOLDER = BASE_DIR / "merged_data"
+# 任务结果生成后不再修改，允许客户端缓存下载结果
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 3600
 
 # 确保目录存在并设置权限
-for folder in [UPLOAD_FOLDER, PROCESSED_FOLDER, TEMP_FOLDER, CONVERTED_FOLDER, SLICED_FOLDER, MERGED_FOLDER]:
+for folder in [UPLOAD_FOLDER, PROCESSED_FOLDER, TEMP_FOLDER, HASH_CACHE_FOLDER]:
     folder.mkdir(exist_ok=True)
     # 设置目录权限为777，确保所有用户都有读写权限
     os.chmod(folder, 0o777)
@@ -69,10 +73,164 @@ ALLOWED_EXTENSIONS = {
     'txt', 'pdf', 'docx', 'doc', 'html', 'htm', 'pptx', 'xlsx', 'md'
 }
 
+# 文件名中需要替换的字符：保留中文、英文字母、数字、点号、下划线和连字符
+UNSAFE_FILENAME_CHARS = re.compile(r'[^\u4e00-\u9fa5a-zA-Z0-9._-]')
+
+# 文档转换进程池：PDF/DOCX解析以CPU计算为主，使用多进程绕过GIL
+# 进程池在首次使用时创建，保证每个gunicorn worker各自持有，不在导入或fork前创建
+CONVERT_POOL_SIZE = int(os.environ.get('CONVERT_POOL_SIZE', os.cpu_count() or 1))
+CONVERT_POOL: Optional[ProcessPoolExecutor] = None
+CONVERT_POOL_LOCK = threading.Lock()
+# 批量合并时每个进程负责的文档数量
+MERGE_BATCH_SIZE = 8
+
+# 异步任务队列及后台工作线程
+TASK_QUEUE = queue.Queue()
+TASK_WORKER_COUNT = 2
+TASK_WORKERS = []
+TASK_WORKERS_LOCK = threading.Lock()
+
+# 任务结果目录中记录结果文件列表的索引文件，下载序号即列表下标
+# 与TASK_STATUS_FILENAME一样以点号开头，不会与按文档名创建的结果目录冲突
+RESULT_INDEX_FILENAME = ".index.json"
+
+# 上传文件写盘时的分块大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 流式上传接口的请求体大小限制，内存占用与文件大小无关
+STREAM_UPLOAD_MAX_LENGTH = 10 * 1024 * 1024 * 1024  # 10GB
+
+# 决定处理结果的代码和配置文件，内容哈希缓存的键包含它们的哈希，
+# 任一文件变化后旧的缓存结果不再命中
+PIPELINE_FILES = [
+    "convert_doc_to_md.py", "text_chunker.py", "merge_json_files.py",
+    "conversion_config.json", "chunk_config.json", "merge_config.json"
+]
+
+def compute_pipeline_version() -> str:
+    """计算处理流程代码及配置文件的哈希（不存在的文件按空内容计算）"""
+    digest = hashlib.sha256()
+    for name in PIPELINE_FILES:
+        digest.update(name.encode('utf-8') + b'\0')
+        try:
+            digest.update((BASE_DIR / name).read_bytes())
+        except OSError:
+            pass
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+PIPELINE_VERSION = compute_pipeline_version()
+
 def allowed_file(filename: str) -> bool:
     """检查文件扩展名是否被允许"""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in ALLOWED_EXTENSIONS
+
+def save_upload(stream, file_path: Path) -> None:
+    """按固定大小分块将上传数据流写入磁盘，避免整个文件驻留内存"""
+    with open(file_path, 'wb') as dst:
+        shutil.copyfileobj(stream, dst, length=UPLOAD_CHUNK_SIZE)
+
+def move_result_file(src: Path, dst: Path) -> None:
+    """将合并结果移动到结果目录，同一文件系统内仅修改元数据，跨文件系统时退回复制"""
+    try:
+        os.replace(src, dst)
+    except OSError:
+        shutil.copy(src, dst)
+
+def link_result_dir(src_dir: Path, dst_dir: Path) -> None:
+    """以硬链接方式复制结果目录中的文件，不支持硬链接时退回复制"""
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    for item in src_dir.iterdir():
+        if item.is_file():
+            try:
+                os.link(item, dst_dir / item.name)
+            except OSError:
+                shutil.copy(item, dst_dir / item.name)
+
+def hash_cache_dir(digest: str) -> Path:
+    """内容哈希对应的缓存目录，按处理流程版本区分"""
+    return HASH_CACHE_FOLDER / f"{PIPELINE_VERSION}-{digest}"
+
+def reuse_cached_result(task_id: str, digest: str, doc_name: str) -> bool:
+    """相同内容和文件名的文档已处理过时，将缓存结果链接到当前任务目录"""
+    cached_dir = hash_cache_dir(digest) / doc_name
+    if not (cached_dir / "result.json").is_file():
+        return False
+    link_result_dir(cached_dir, PROCESSED_FOLDER / task_id / doc_name)
+    # 刷新修改时间，清理线程只删除长期未被复用的缓存条目
+    try:
+        os.utime(hash_cache_dir(digest))
+    except OSError:
+        pass
+    return True
+
+def store_cached_result(task_id: str, digest: str, doc_name: str) -> None:
+    """将任务结果登记到内容哈希缓存"""
+    cached_dir = hash_cache_dir(digest) / doc_name
+    if cached_dir.exists():
+        return
+    # 先在临时目录中建立链接再整体改名，避免其他请求读到不完整的缓存
+    staging_dir = hash_cache_dir(digest) / f".{task_id}"
+    try:
+        link_result_dir(PROCESSED_FOLDER / task_id / doc_name, staging_dir)
+        os.replace(staging_dir, cached_dir)
+    except OSError as e:
+        logger.warning(f"登记结果缓存失败: {str(e)}")
+        rmtree_fast(staging_dir)
+
+def get_convert_pool() -> ProcessPoolExecutor:
+    """获取当前进程的转换进程池，首次调用时创建"""
+    global CONVERT_POOL
+    with CONVERT_POOL_LOCK:
+        if CONVERT_POOL is None:
+            # gthread worker中其他线程可能在fork时持有锁（日志、导入锁等），改用forkserver启动子进程
+            CONVERT_POOL = ProcessPoolExecutor(max_workers=CONVERT_POOL_SIZE, initializer=init_converter,
+                                               mp_context=multiprocessing.get_context("forkserver"))
+        return CONVERT_POOL
+
+def merge_in_batches(converted_dir: Path, sliced_dir: Path, merged_dir: Path) -> List[Tuple[str, Path]]:
+    """
+    文档较多时按批次划分，在进程池中并行合并各批文档
+    
+    Returns:
+        各文档的文档名及其result.json路径
+    """
+    doc_names = sorted(p.name for p in sliced_dir.iterdir() if p.is_dir())
+    if len(doc_names) <= MERGE_BATCH_SIZE:
+        merged = merge_document_data(str(converted_dir), str(sliced_dir), str(merged_dir))
+        return [(doc_name, Path(path)) for doc_name, path in merged]
+    
+    # 各文档的合并结果写入merged_dir下各自的子目录，批次之间互不影响
+    pool = get_convert_pool()
+    futures = [
+        pool.submit(merge_document_data, str(converted_dir), str(sliced_dir), str(merged_dir),
+                    doc_names=doc_names[i:i + MERGE_BATCH_SIZE])
+        for i in range(0, len(doc_names), MERGE_BATCH_SIZE)
+    ]
+    merged_files = []
+    for future in as_completed(futures):
+        merged_files.extend((doc_name, Path(path)) for doc_name, path in future.result())
+    return merged_files
+
+def cleanup_temp_files(task_id: str) -> None:
+    """删除任务的临时目录（上传文件及中间处理结果）"""
+    rmtree_fast(TEMP_FOLDER / task_id)
+
+def dumps_json(data: Dict[str, Any]) -> bytes:
+    """序列化为UTF-8编码的JSON，中文字符不做转义"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+def loads_json(data: bytes) -> Any:
+    """解析UTF-8编码的JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_response(data: Dict[str, Any], status: int = 200) -> Response:
+    """生成JSON响应"""
+    return Response(dumps_json(data), status=status, mimetype='application/json')
 
 def generate_task_id() -> str:
     """生成唯一任务ID"""
@@ -82,17 +240,185 @@ def secure_filename_chinese(filename: str) -> str:
     """
     处理中文文件名的secure_filename函数
     """
-    # 只保留文件名中的基本字符，但允许中文字符
-    import re
-    # 移除路径部分
-    filename = os.path.basename(filename)
-    # 保留中文、英文字母、数字、点号、下划线和连字符
-    filename = re.sub(r'[^\u4e00-\u9fa5a-zA-Z0-9._-]', '_', filename)
+    # 移除路径部分，只保留文件名中的基本字符，但允许中文字符
+    filename = UNSAFE_FILENAME_CHARS.sub('_', os.path.basename(filename))
     # 确保文件名不以点号开头
     if filename.startswith('.'):
         filename = '_' + filename
     return filename or 'unnamed_file'
 
+def build_task_result(task_id: str, result_files: List[str]) -> Dict[str, Any]:
+    """
+    生成已完成任务的结果信息，并记录结果文件索引
+    
+    下载地址使用结果文件在索引中的序号，避免文件名中的中文和特殊字符带来的URL编码问题
+    """
+    index_path = PROCESSED_FOLDER / task_id / RESULT_INDEX_FILENAME
+    index_path.write_bytes(dumps_json(result_files))
+    download_urls = [f"/api/v1/download/{task_id}/{idx}" for idx in range(len(result_files))]
+    return {
+        "task_id": task_id,
+        "status": "completed",
+        "result_files": result_files,
+        "download_urls": download_urls
+    }
+
+def run_pipeline(task_id: str, filenames: List[str], digest: Optional[str] = None) -> Dict[str, Any]:
+    """
+    对任务临时目录中已保存的文件依次执行转换、分块和合并，
+    并将结果移动到处理目录
+    
+    Args:
+        task_id: 任务ID
+        filenames: 任务输入目录中的文件名列表
+        digest: 单文档的内容哈希，提供时将结果登记到缓存
+    
+    Returns:
+        包含结果文件列表和下载地址的任务结果
+    """
+    task_temp_dir = TEMP_FOLDER / task_id
+    input_dir = task_temp_dir / "input"
+    
+    # 每个任务使用独立的中间目录，避免并发任务相互干扰
+    converted_dir = task_temp_dir / "converted_data"
+    sliced_dir = task_temp_dir / "sliced_data"
+    merged_dir = task_temp_dir / "merged_data"
+    for folder in (converted_dir, sliced_dir, merged_dir):
+        folder.mkdir(exist_ok=True)
+    
+    # 步骤1: 文档转换
+    logger.info(f"任务 {task_id}: 开始文档转换")
+    if len(filenames) == 1:
+        if not convert_file_to_md(str(input_dir / filenames[0]), str(converted_dir)):
+            raise Exception("文档转换失败")
+    else:
+        # 各文件的转换相互独立，提交到进程池并行转换
+        pool = get_convert_pool()
+        futures = {
+            pool.submit(convert_file_to_md, str(input_dir / filename), str(converted_dir)): filename
+            for filename in filenames
+        }
+        for future in as_completed(futures):
+            if not future.result():
+                logger.warning(f"文件 {futures[future]} 转换失败")
+    
+    # 步骤2: 文本分块
+    logger.info(f"任务 {task_id}: 开始文本分块")
+    # 服务中各任务已由工作线程并发处理，分块在当前进程内完成，不为每个任务单独创建进程池
+    process_all_documents(str(converted_dir), str(sliced_dir), max_workers=1)
+    
+    # 步骤3: 数据合并
+    logger.info(f"任务 {task_id}: 开始数据合并")
+    # 合并步骤直接返回生成的result.json，无需再遍历merged_dir
+    merged_files = merge_in_batches(converted_dir, sliced_dir, merged_dir)
+    
+    if not merged_files:
+        raise Exception("未找到合并后的文件")
+    
+    # 将结果移动到处理目录
+    result_dir = PROCESSED_FOLDER / task_id
+    result_dir.mkdir(exist_ok=True)
+    
+    # 为每个文档创建对应的文件夹并移动result.json和图片文件
+    result_files = []
+    for doc_name, result_file_path in merged_files:
+        doc_result_dir = result_dir / doc_name
+        doc_result_dir.mkdir(exist_ok=True)
+        # 移动result.json文件
+        move_result_file(result_file_path, doc_result_dir / "result.json")
+        result_files.append(f"{doc_name}/result.json")
+        # 移动图片文件
+        merged_doc_dir = merged_dir / doc_name
+        if merged_doc_dir.exists():
+            for item in merged_doc_dir.iterdir():
+                if item.is_file() and item.suffix.lower() in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
+                    move_result_file(item, doc_result_dir / item.name)
+    
+    if digest and len(merged_files) == 1:
+        store_cached_result(task_id, digest, merged_files[0][0])
+    
+    return build_task_result(task_id, result_files)
+
+def write_task_status(task_id: str, status: Dict[str, Any]) -> None:
+    """写入异步任务的状态文件（先写临时文件再替换，读取方总能看到完整内容）"""
+    status_dir = PROCESSED_FOLDER / task_id
+    status_dir.mkdir(exist_ok=True)
+    tmp_path = status_dir / f"{TASK_STATUS_FILENAME}.tmp"
+    tmp_path.write_bytes(dumps_json(status))
+    os.replace(tmp_path, status_dir / TASK_STATUS_FILENAME)
+
+def task_worker() -> None:
+    """后台工作线程：从任务队列中取出异步任务并执行处理流程"""
+    while True:
+        task_id, filenames, digest = TASK_QUEUE.get()
+        write_task_status(task_id, {"task_id": task_id, "status": "processing"})
+        try:
+            write_task_status(task_id, run_pipeline(task_id, filenames, digest))
+            logger.info(f"异步任务 {task_id} 处理完成")
+        except Exception as e:
+            logger.error(f"异步任务 {task_id} 处理失败: {str(e)}")
+            write_task_status(task_id, {"task_id": task_id, "status": "failed", "error": f"处理失败: {str(e)}"})
+        finally:
+            cleanup_temp_files(task_id)
+            TASK_QUEUE.task_done()
+
+def start_task_workers() -> None:
+    """按需启动后台工作线程（首次提交异步任务时启动，避免在导入或fork前创建线程）"""
+    with TASK_WORKERS_LOCK:
+        if TASK_WORKERS:
+            return
+        for i in range(TASK_WORKER_COUNT):
+            worker = threading.Thread(target=task_worker, name=f"task-worker-{i}", daemon=True)
+            worker.start()
+            TASK_WORKERS.append(worker)
+
+def is_async_request() -> bool:
+    """请求是否要求异步处理（表单字段或查询参数 async=true）"""
+    return request.values.get('async', '').lower() in ('1', 'true', 'yes')
+
+def accepted_response(task_id: str, status: str) -> Response:
+    """异步请求的202响应：任务ID、当前状态和状态查询地址"""
+    return json_response({
+        "task_id": task_id,
+        "status": status,
+        "status_url": f"/api/v1/status/{task_id}"
+    }, status=202)
+
+def submit_task(task_id: str, filenames: List[str], digest: Optional[str] = None) -> Response:
+    """将任务加入后台队列，立即返回202和状态查询地址"""
+    write_task_status(task_id, {"task_id": task_id, "status": "pending"})
+    start_task_workers()
+    TASK_QUEUE.put((task_id, filenames, digest))
+    logger.info(f"任务 {task_id} 已加入异步队列")
+    return accepted_response(task_id, "pending")
+
+def process_saved_document(task_id: str, filename: str) -> Tuple[Response, bool]:
+    """
+    处理已保存到任务输入目录的单个文档
+    
+    Returns:
+        响应（同步请求返回200；异步请求返回202，复用缓存时状态已为completed），
+        以及任务是否已加入异步队列（加入队列时由后台线程清理临时目录）
+    """
+    file_path = TEMP_FOLDER / task_id / "input" / filename
+    
+    # 相同文档已处理过时跳过转换、分块和合并
+    digest = file_sha256(file_path)
+    doc_name = os.path.splitext(filename)[0]
+    if reuse_cached_result(task_id, digest, doc_name):
+        logger.info(f"任务 {task_id}: 复用内容相同文档的处理结果 {digest}")
+        result = build_task_result(task_id, [f"{doc_name}/result.json"])
+        if is_async_request():
+            # 保持异步接口的约定：返回202和状态查询地址，状态文件直接记录完成结果
+            write_task_status(task_id, result)
+            return accepted_response(task_id, result["status"]), False
+        return json_response(result), False
+    
+    if is_async_request():
+        return submit_task(task_id, [filename], digest), True
+    
+    return json_response(run_pipeline(task_id, [filename], digest)), False
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """健康检查接口"""
@@ -106,6 +432,7 @@ def process_document():
     """处理单个文档的主接口"""
     task_id = generate_task_id()
     logger.info(f"开始处理任务: {task_id}")
+    queued = False
     
     try:
         # 检查是否有文件上传
@@ -125,94 +452,77 @@ def process_document():
         
         # 保存上传的文件（使用改进的文件名处理）
         filename = secure_filename_chinese(file.filename)
-        task_temp_dir = TEMP_FOLDER / task_id
-        task_temp_dir.mkdir(exist_ok=True)
-        
-        input_dir = task_temp_dir / "input"
-        input_dir.mkdir(exist_ok=True)
+        input_dir = TEMP_FOLDER / task_id / "input"
+        input_dir.mkdir(parents=True, exist_ok=True)
         
         file_path = input_dir / filename
-        file.save(file_path)
+        save_upload(file.stream, file_path)
         logger.info(f"文件已保存: {file_path}")
         
-        # 使用全局目录而不是临时目录
-        converted_dir = CONVERTED_FOLDER
-        sliced_dir = SLICED_FOLDER
-        merged_dir = MERGED_FOLDER
-        
-        # 步骤1: 文档转换
-        logger.info(f"任务 {task_id}: 开始文档转换")
-        if not convert_file_to_md(str(file_path), str(converted_dir)):
-            raise Exception("文档转换失败")
-        
-        # 步骤2: 文本分块
-        logger.info(f"任务 {task_id}: 开始文本分块")
-        process_all_documents(str(converted_dir), str(sliced_dir))
-        
-        # 步骤3: 数据合并
-        logger.info(f"任务 {task_id}: 开始数据合并")
-        merge_document_data(str(converted_dir), str(sliced_dir), str(merged_dir))
-        
-        # 查找生成的合并文件（现在在各自的文件夹中）
-        # 查找merged_dir下所有子目录中的result.json文件
-        merged_files = []
-        for subdir in merged_dir.iterdir():
-            if subdir.is_dir():
-                result_file = subdir / "result.json"
-                if result_file.exists():
-                    merged_files.append((subdir.name, result_file))
+        response, queued = process_saved_document(task_id, filename)
+        return response
         
-        if not merged_files:
-            raise Exception("未找到合并后的文件")
+    except RequestEntityTooLarge:
+        # 交给413错误处理器，返回实际适用的大小限制
+        raise
+    except Exception as e:
+        logger.error(f"任务 {task_id} 处理失败: {str(e)}")
+        return jsonify({"error": f"处理失败: {str(e)}"}), 500
+    finally:
+        if not queued:
+            cleanup_temp_files(task_id)
+
+@app.route('/api/v1/upload-stream', methods=['POST'])
+def upload_stream():
+    """
+    流式上传并处理单个文档
+    
+    请求体即文件内容（支持Transfer-Encoding: chunked），文件名通过
+    Content-Disposition头或filename查询参数传入。请求体不经过multipart解析，
+    直接分块写入磁盘，因此使用单独的STREAM_UPLOAD_MAX_LENGTH限制
+    """
+    task_id = generate_task_id()
+    logger.info(f"开始处理流式上传任务: {task_id}")
+    queued = False
+    # 仅对该接口放宽请求体大小限制（设为None会回退到MAX_CONTENT_LENGTH）
+    request.max_content_length = STREAM_UPLOAD_MAX_LENGTH
+    
+    try:
+        _, options = parse_options_header(request.headers.get('Content-Disposition', ''))
+        original_filename = options.get('filename') or request.args.get('filename', '')
+        if not original_filename:
+            return jsonify({"error": "文件名为空"}), 400
         
-        # 将结果移动到处理目录
-        result_dir = PROCESSED_FOLDER / task_id
-        result_dir.mkdir(exist_ok=True)
+        if not allowed_file(original_filename):
+            return jsonify({"error": "不支持的文件类型"}), 400
         
-        # 为每个文档创建对应的文件夹并复制result.json和图片文件
-        result_files = []
-        for doc_name, result_file_path in merged_files:
-            doc_result_dir = result_dir / doc_name
-            doc_result_dir.mkdir(exist_ok=True)
-            # 复制result.json文件
-            shutil.copy(result_file_path, doc_result_dir / "result.json")
-            result_files.append(f"{doc_name}/result.json")
-            # 复制图片文件
-            merged_doc_dir = merged_dir / doc_name
-            if merged_doc_dir.exists():
-                for item in merged_doc_dir.iterdir():
-                    if item.is_file() and item.suffix.lower() in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
-                        shutil.copy(item, doc_result_dir / item.name)
+        filename = secure_filename_chinese(original_filename)
+        input_dir = TEMP_FOLDER / task_id / "input"
+        input_dir.mkdir(parents=True, exist_ok=True)
         
-
+        file_path = input_dir / filename
+        save_upload(request.stream, file_path)
+        logger.info(f"文件已保存: {file_path}")
         
-        # 返回结果
-        # 不再对文件路径进行URL编码，直接使用原始路径
-        download_urls = [f"/api/v1/download/{task_id}/{filename}" for filename in result_files]
-        response_data = {
-            "task_id": task_id,
-            "status": "completed",
-            "result_files": result_files,
-            "download_urls": download_urls
-        }
-        # 使用json.dumps直接控制编码选项
-        import json
-        response_json = json.dumps(response_data, ensure_ascii=False)
-        return app.response_class(
-            response=response_json,
-            status=200,
-            mimetype='application/json'
-        )
+        response, queued = process_saved_document(task_id, filename)
+        return response
         
+    except RequestEntityTooLarge:
+        # 交给413错误处理器，返回实际适用的大小限制
+        raise
     except Exception as e:
         logger.error(f"任务 {task_id} 处理失败: {str(e)}")
         return jsonify({"error": f"处理失败: {str(e)}"}), 500
+    finally:
+        if not queued:
+            cleanup_temp_files(task_id)
 
 @app.route('/api/v1/batch-process', methods=['POST'])
 def batch_process():
     """批量处理文档接口"""
     task_id = generate_task_id()
     logger.info(f"开始批量处理任务: {task_id}")
+    queued = False
     
     try:
         # 检查是否有文件上传
@@ -224,129 +534,104 @@ def batch_process():
             return jsonify({"error": "文件列表为空"}), 400
         
         # 保存上传的文件
-        task_temp_dir = TEMP_FOLDER / task_id
-        task_temp_dir.mkdir(exist_ok=True)
-        
-        input_dir = task_temp_dir / "input"
-        input_dir.mkdir(exist_ok=True)
+        input_dir = TEMP_FOLDER / task_id / "input"
+        input_dir.mkdir(parents=True, exist_ok=True)
         
         saved_files = []
         for file in files:
             if file and file.filename and allowed_file(file.filename):
                 filename = secure_filename_chinese(file.filename)
                 file_path = input_dir / filename
-                file.save(file_path)
+                save_upload(file.stream, file_path)
                 saved_files.append(filename)
                 logger.info(f"文件已保存: {file_path}")
         
         if not saved_files:
             return jsonify({"error": "没有有效的文件被上传"}), 400
         
-        # 使用全局目录而不是临时目录
-        converted_dir = CONVERTED_FOLDER
-        sliced_dir = SLICED_FOLDER
-        merged_dir = MERGED_FOLDER
-        
-        # 步骤1: 文档转换
-        logger.info(f"任务 {task_id}: 开始批量文档转换")
-        for filename in saved_files:
-            file_path = input_dir / filename
-            if not convert_file_to_md(str(file_path), str(converted_dir)):
-                logger.warning(f"文件 {filename} 转换失败")
-        
-        # 步骤2: 文本分块
-        logger.info(f"任务 {task_id}: 开始批量文本分块")
-        process_all_documents(str(converted_dir), str(sliced_dir))
-        
-        # 步骤3: 数据合并
-        logger.info(f"任务 {task_id}: 开始批量数据合并")
-        merge_document_data(str(converted_dir), str(sliced_dir), str(merged_dir))
+        if is_async_request():
+            queued = True
+            return submit_task(task_id, saved_files)
         
-        # 将结果移动到处理目录
-        result_dir = PROCESSED_FOLDER / task_id
-        result_dir.mkdir(exist_ok=True)
-        
-        # 查找merged_dir下所有子目录中的result.json文件
-        merged_files = []
-        for subdir in merged_dir.iterdir():
-            if subdir.is_dir():
-                result_file = subdir / "result.json"
-                if result_file.exists():
-                    merged_files.append((subdir.name, result_file))
-        
-        if not merged_files:
-            raise Exception("未找到合并后的文件")
-        
-        # 为每个文档创建对应的文件夹并复制result.json和图片文件
-        result_files = []
-        for doc_name, result_file_path in merged_files:
-            doc_result_dir = result_dir / doc_name
-            doc_result_dir.mkdir(exist_ok=True)
-            # 复制result.json文件
-            shutil.copy(result_file_path, doc_result_dir / "result.json")
-            result_files.append(f"{doc_name}/result.json")
-            # 复制图片文件
-            merged_doc_dir = merged_dir / doc_name
-            if merged_doc_dir.exists():
-                for item in merged_doc_dir.iterdir():
-                    if item.is_file() and item.suffix.lower() in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
-                        shutil.copy(item, doc_result_dir / item.name)
-        
-
-        
-        # 返回结果
-        # 不再对文件路径进行URL编码，直接使用原始路径
-        download_urls = [f"/api/v1/download/{task_id}/{filename}" for filename in result_files]
-        response_data = {
-            "task_id": task_id,
-            "status": "completed",
-            "result_files": result_files,
-            "download_urls": download_urls
-        }
-        # 使用json.dumps直接控制编码选项
-        import json
-        response_json = json.dumps(response_data, ensure_ascii=False)
-        return app.response_class(
-            response=response_json,
-            status=200,
-            mimetype='application/json'
-        )
+        return json_response(run_pipeline(task_id, saved_files))
         
+    except RequestEntityTooLarge:
+        # 交给413错误处理器，返回实际适用的大小限制
+        raise
     except Exception as e:
         logger.error(f"批量任务 {task_id} 处理失败: {str(e)}")
         return jsonify({"error": f"批量处理失败: {str(e)}"}), 500
+    finally:
+        if not queued:
+            cleanup_temp_files(task_id)
 
-@app.route('/api/v1/download/<task_id>/<chinese_path:filename>', methods=['GET'])
-def download_result(task_id: str, filename: str):
-    """下载处理结果文件"""
+@app.route('/api/v1/status/<task_id>', methods=['GET'])
+def task_status(task_id: str):
+    """查询异步任务的处理状态"""
+    status_path = PROCESSED_FOLDER / task_id / TASK_STATUS_FILENAME
+    if not status_path.is_file():
+        return jsonify({"error": "任务不存在"}), 404
+    return Response(status_path.read_bytes(), mimetype='application/json')
+
+def send_result_file(result_path: Path, download_name: str) -> Response:
+    """以附件形式发送结果文件，文件不存在时返回404"""
     try:
-        # 直接使用传入的文件名，不再进行URL解码
-        decoded_filename = filename
-        
-        # 处理新的目录结构（filename可能包含路径分隔符）
-        result_path = PROCESSED_FOLDER / task_id / decoded_filename
-        if not result_path.exists():
-            logger.error(f"文件未找到: {result_path}")
-            abort(404)
-        
-        # 提取实际的文件名用于下载
-        actual_filename = os.path.basename(decoded_filename)
-        if not actual_filename:
-            actual_filename = "result.json"
-        
-        logger.info(f"下载文件: {result_path}")
-        return send_file(
+        # 不单独检查文件是否存在：send_file内部的一次stat同时用于存在性判断、
+        # Content-Length和Last-Modified。传入真实文件路径，WSGI服务器可通过
+        # wsgi.file_wrapper使用sendfile零拷贝发送，并支持ETag/Range条件请求
+        response = send_file(
             result_path,
             as_attachment=True,
-            download_name=actual_filename
+            download_name=download_name,
+            conditional=True,
+            etag=True
         )
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+        logger.error(f"文件未找到: {result_path}")
+        abort(404)
     except Exception as e:
         logger.error(f"下载文件失败: {str(e)}")
         abort(500)
+    
+    logger.info(f"下载文件: {result_path}")
+    return response
+
+@app.route('/api/v1/download/<uuid:task_id>/<int:idx>', methods=['GET'])
+def download_result_by_index(task_id, idx: int):
+    """按结果序号下载处理结果文件"""
+    task_dir = PROCESSED_FOLDER / str(task_id)
+    try:
+        result_files = loads_json((task_dir / RESULT_INDEX_FILENAME).read_bytes())
+    except FileNotFoundError:
+        abort(404)
+    if idx >= len(result_files):
+        abort(404)
+    
+    result_file = result_files[idx]
+    return send_result_file(task_dir / result_file, os.path.basename(result_file))
+
+@app.route('/api/v1/download/<task_id>/<path:filename>', methods=['GET'])
+def download_result(task_id: str, filename: str):
+    """按结果文件路径下载处理结果文件（兼容旧的下载地址）"""
+    # 处理新的目录结构（filename可能包含路径分隔符）
+    result_path = PROCESSED_FOLDER / task_id / filename
+    
+    # 提取实际的文件名用于下载
+    actual_filename = os.path.basename(filename)
+    if not actual_filename:
+        actual_filename = "result.json"
+    
+    return send_result_file(result_path, actual_filename)
 
 @app.errorhandler(RequestEntityTooLarge)
 def handle_file_too_large(e):
-    return jsonify({"error": "文件大小超过限制（最大50MB）"}), 413
+    # 流式上传接口单独放宽了限制，提示当前请求实际适用的大小上限
+    limit = request.max_content_length or app.config['MAX_CONTENT_LENGTH']
+    if limit >= 1024 * 1024 * 1024:
+        limit_text = f"{limit / (1024 * 1024 * 1024):g}GB"
+    else:
+        limit_text = f"{limit / (1024 * 1024):g}MB"
+    return jsonify({"error": f"文件大小超过限制（最大{limit_text}）"}), 413
 
 @app.errorhandler(404)
 def not_found(error):
@@ -358,4 +643,6 @@ def internal_error(error):
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # 开发服务器；生产环境使用 gunicorn -c gunicorn.conf.py app:app
+    start_cleanup_thread()
+    app.run(host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1')
\ No newline at end of file
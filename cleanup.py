@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务目录布局及残留文件清理
+
+只依赖标准库，gunicorn master进程可以直接导入并启动清理线程，
+无需加载Flask应用和文档处理依赖
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 日志格式，服务进程与gunicorn master进程共用
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 服务目录
+BASE_DIR = Path(__file__).parent
+UPLOAD_FOLDER = BASE_DIR / "uploads"
+PROCESSED_FOLDER = BASE_DIR / "processed"
+TEMP_FOLDER = BASE_DIR / "temp"
+
+# 按文件内容SHA-256索引的处理结果，重复上传相同文档时直接复用
+# 放在下载目录之外，缓存结果只能通过任务目录中的链接下载
+HASH_CACHE_FOLDER = BASE_DIR / "hash_cache"
+
+# 异步任务的状态文件：以点号开头，secure_filename_chinese生成的文档名不会与之冲突
+TASK_STATUS_FILENAME = ".status.json"
+
+# 残留临时文件的清理：超过存活时间的条目才会被删除
+CLEANUP_INTERVAL = 300
+TEMP_FILE_TTL = 3600
+# 内容哈希缓存条目在该时间内未被复用时删除
+HASH_CACHE_TTL = 7 * 24 * 3600
+# 待清理的目录及其条目存活时间
+CLEANUP_FOLDERS = [
+    (UPLOAD_FOLDER, TEMP_FILE_TTL),
+    (TEMP_FOLDER, TEMP_FILE_TTL),
+    (HASH_CACHE_FOLDER, HASH_CACHE_TTL),
+]
+# 排队中或处理中的异步任务不清理其临时目录，状态超过该时间未更新时视为已中断
+ACTIVE_TASK_TTL = 24 * 3600
+
+def rmtree_fast(root) -> None:
+    """
+    自底向上删除目录树，忽略删除过程中的错误
+    
+    os.walk按目录顺序读取条目，逐个unlink文件后rmdir空目录，
+    不需要像shutil.rmtree那样对每个条目单独lstat
+    """
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        for name in filenames:
+            try:
+                os.unlink(os.path.join(dirpath, name))
+            except OSError:
+                pass
+        for name in dirnames:
+            path = os.path.join(dirpath, name)
+            try:
+                os.rmdir(path)
+            except NotADirectoryError:
+                # 指向目录的符号链接出现在dirnames中，只删除链接本身
+                os.unlink(path)
+            except OSError:
+                pass
+    try:
+        os.rmdir(root)
+    except OSError:
+        pass
+
+def is_task_active(task_id: str) -> bool:
+    """异步任务是否仍在排队或处理中（状态文件在ACTIVE_TASK_TTL内更新过）"""
+    status_path = PROCESSED_FOLDER / task_id / TASK_STATUS_FILENAME
+    try:
+        if time.time() - status_path.stat().st_mtime > ACTIVE_TASK_TTL:
+            return False
+        status = json.loads(status_path.read_bytes())
+    except (OSError, ValueError):
+        return False
+    return status.get("status") in ("pending", "processing")
+
+def sweep_expired_files(folder: Path, ttl: float, keep: Optional[Callable[[str], bool]] = None) -> int:
+    """
+    删除目录下修改时间早于存活时间的条目
+    
+    使用os.scandir遍历，DirEntry自带类型信息，每个条目只需一次stat
+    
+    Args:
+        folder: 待清理的目录
+        ttl: 存活时间（秒）
+        keep: 按条目名判断是否保留过期条目
+    
+    Returns:
+        删除的条目数量
+    """
+    now = time.time()
+    removed = 0
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                try:
+                    if now - entry.stat(follow_symlinks=False).st_mtime <= ttl:
+                        continue
+                    if keep is not None and keep(entry.name):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        rmtree_fast(entry.path)
+                    else:
+                        os.unlink(entry.path)
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"清理 {entry.path} 失败: {str(e)}")
+    except FileNotFoundError:
+        pass
+    return removed
+
+def scheduled_cleanup() -> None:
+    """定时清理崩溃或中断后残留的上传文件和临时目录"""
+    while True:
+        time.sleep(CLEANUP_INTERVAL)
+        for folder, ttl in CLEANUP_FOLDERS:
+            # 临时目录按任务ID命名，异步任务排队或处理期间保留其输入文件
+            keep = is_task_active if folder == TEMP_FOLDER else None
+            removed = sweep_expired_files(folder, ttl, keep)
+            if removed:
+                logger.info(f"已清理 {folder} 下 {removed} 个过期条目")
+
+def start_cleanup_thread() -> None:
+    """
+    启动后台清理线程
+    
+    开发服务器在启动时调用；gunicorn部署时由gunicorn.conf.py在master进程中调用，
+    避免每个worker各启动一个清理线程
+    """
+    threading.Thread(target=scheduled_cleanup, name="scheduled-cleanup", daemon=True).start()
@@ -7,9 +7,14 @@ import os
 import sys
 import json
 import argparse
-import base64
+import hashlib
 import re
-from typing import Dict, List, Tuple
+import shutil
+import threading
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 from zipfile import ZipFile
 import xml.etree.ElementTree as ET
 
@@ -29,12 +34,55 @@ except ImportError as e:
     MarkItDown = None
     MARKITDOWN_AVAILABLE = False
 
+# 可选：使用orjson写出图片索引，base64编码以ASCII字节直接写入，无需先解码为str
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 可选：使用pybase64（SIMD实现）进行base64编解码，接口与标准库一致
+try:
+    from pybase64 import b64encode, b64decode
+except ImportError:
+    from base64 import b64encode, b64decode
+
+# 图片流式base64编码时每次读取的块大小，取3的倍数使各块的编码结果可以直接拼接
+BASE64_CHUNK_SIZE = 3 * 256 * 1024
+
+# 匹配Markdown中的base64图片（媒体类型部分使用宽松匹配）
+BASE64_IMAGE_PATTERN = re.compile(r'data:image/[^;]+;base64,([a-zA-Z0-9+/=]+)')
+
+# 转换结果目录中记录输入文件信息的缓存文件，输入未变化时跳过重复转换
+CONVERT_CACHE_FILENAME = ".convert_cache.json"
+
+# 图片base64编码按内容哈希保存在输出根目录下的共享目录中，多个文档中重复的图片只保存一份
+IMAGE_BLOB_DIRNAME = "_blobs"
+IMAGE_BLOB_SUFFIX = ".b64"
+
 # 获取当前脚本的目录
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
+# 每个线程复用各自的MarkItDown实例，避免每个文件都重新创建转换器
+markitdown_local = threading.local()
+
+def get_markitdown():
+    """获取当前线程的MarkItDown实例，首次调用时创建"""
+    md = getattr(markitdown_local, 'instance', None)
+    if md is None:
+        md = MarkItDown()
+        markitdown_local.instance = md
+    return md
+
+def init_converter():
+    """进程池的初始化函数：在工作进程启动时预先创建MarkItDown实例"""
+    if MARKITDOWN_AVAILABLE and MarkItDown is not None:
+        get_markitdown()
+
 # 动态查找配置文件路径
+@lru_cache(maxsize=32)
 def find_config_file(config_file: str) -> str:
-    """动态查找配置文件路径"""
+    """动态查找配置文件路径（同一进程内结果不变，缓存查找结果）"""
     # 检查几种可能的路径
     possible_paths = [
         os.path.join(script_dir, config_file),  # 当前目录
@@ -49,19 +97,27 @@ def find_config_file(config_file: str) -> str:
     
     return config_file  # 返回原始路径，让系统决定
 
-# 从配置文件加载参数
-def load_conversion_config(config_file: str = "conversion_config.json") -> dict:
-    """从配置文件加载转换参数"""
-    # 动态查找配置文件
-    config_path = find_config_file(config_file)
-    
+@lru_cache(maxsize=32)
+def read_config_file(config_path: str) -> Optional[dict]:
+    """读取并解析配置文件，同一路径只解析一次；文件不存在或解析失败时返回None"""
     if os.path.exists(config_path):
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            return config
+                return json.load(f)
         except Exception as e:
             print(f"读取配置文件时出错: {str(e)}，使用默认参数")
+    return None
+
+# 从配置文件加载参数
+def load_conversion_config(config_file: str = "conversion_config.json") -> dict:
+    """从配置文件加载转换参数"""
+    # 动态查找配置文件
+    config_path = os.path.abspath(find_config_file(config_file))
+    
+    config = read_config_file(config_path)
+    if config is not None:
+        # 返回副本，调用方修改时不影响缓存
+        return dict(config)
     
     # 默认参数
     return {
@@ -79,22 +135,78 @@ def get_file_extension(filepath: str) -> str:
     """获取文件扩展名"""
     return os.path.splitext(filepath)[1].lower()
 
-def convert_file_to_md(input_path, output_dir="converted_data"):
+def file_sha256(file_path: str) -> str:
+    """计算文件内容的SHA-256"""
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for block in iter(lambda: f.read(BASE64_CHUNK_SIZE), b''):
+            digest.update(block)
+        return digest.hexdigest()
+
+def is_conversion_up_to_date(input_path: str, file_output_dir: str, md_path: str,
+                             stat: Optional[os.stat_result] = None) -> bool:
+    """
+    检查输入文件是否已转换过且内容未变化
+    
+    输入文件的大小和修改时间与缓存记录一致时直接判定为未变化（只需一次stat），
+    否则在大小一致时比较内容的SHA-256；调用方已获取stat结果时可直接传入
+    """
+    try:
+        with open(os.path.join(file_output_dir, CONVERT_CACHE_FILENAME), 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if stat is None:
+            stat = os.stat(input_path)
+    except (OSError, ValueError):
+        return False
+    
+    if not os.path.exists(md_path):
+        return False
+    if cache.get("image_count") and not os.path.exists(os.path.join(file_output_dir, "images_index.json")):
+        return False
+    
+    if cache.get("input_size") != stat.st_size:
+        return False
+    if cache.get("input_mtime") == stat.st_mtime:
+        return True
+    return cache.get("sha256") == file_sha256(input_path)
+
+def save_conversion_cache(input_path: str, file_output_dir: str, image_count: int,
+                          stat: Optional[os.stat_result] = None) -> None:
+    """记录转换成功的输入文件信息"""
+    if stat is None:
+        stat = os.stat(input_path)
+    cache = {
+        "sha256": file_sha256(input_path),
+        "input_size": stat.st_size,
+        "input_mtime": stat.st_mtime,
+        "image_count": image_count
+    }
+    with open(os.path.join(file_output_dir, CONVERT_CACHE_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump(cache, f)
+
+def convert_file_to_md(input_path, output_dir="converted_data", use_cache=False):
     """
     将支持的文件格式转换为同名的 .md 文件
     修改文件生成路径结构为: converted_data/<文件名>/<文件名>.md 和 converted_data/<文件名>/images_index.json
+    图片的base64编码按内容哈希保存在 converted_data/_blobs/ 中，images_index.json 以 base64_ref 引用
     对于.md文件，直接复制到目标位置但仍然处理其中的图片
     
     Args:
         input_path (str): 输入文件路径
         output_dir (str): 输出目录路径
+        use_cache (bool): 输入未变化时跳过转换，并在转换成功后记录输入文件信息
+            （命令行重复转换同一目录时启用；服务中每个任务使用新的输出目录，缓存不会命中）
     """
     if not MARKITDOWN_AVAILABLE or MarkItDown is None:
         print("错误: markitdown 包不可用，请检查依赖安装")
         return False
     
-    # 检查文件是否存在
-    if not os.path.exists(input_path):
+    # 检查文件是否存在（stat结果同时用于后续的转换缓存检查，不再重复stat）
+    try:
+        input_stat = os.stat(input_path)
+    except OSError:
         print(f"错误: 文件 {input_path} 不存在")
         return False
     
@@ -111,18 +223,24 @@ def convert_file_to_md(input_path, output_dir="converted_data"):
     # 创建特定于该文件的输出目录: converted_data/<文件名>/
     file_output_dir = os.path.join(script_dir, output_dir, base_filename)
     os.makedirs(file_output_dir, exist_ok=True)
+    blob_dir = os.path.join(script_dir, output_dir, IMAGE_BLOB_DIRNAME)
     
     # 生成输出文件路径: converted_data/<文件名>/<文件名>.md
     md_filename = base_filename + '.md'
     md_path = os.path.join(file_output_dir, md_filename)
     
+    # 输入文件已转换过且未变化时跳过转换
+    if use_cache and is_conversion_up_to_date(input_path, file_output_dir, md_path, input_stat):
+        print(f"{input_path} 未发生变化，跳过转换: {md_path}")
+        return True
+    
     # 检查是否为.md文件，如果是则直接复制但仍然处理图片
     if input_path.lower().endswith('.md'):
         print(f"检测到.md文件，复制并处理其中的图片: {md_path}")
         try:
-            # 直接复制.md文件
-            import shutil
-            shutil.copy2(input_path, md_path)
+            # 直接复制.md文件（shutil.copyfile在Linux上使用sendfile在内核中完成复制，
+            # 输出文件不需要保留原文件的时间戳和权限，因此不使用copy2）
+            shutil.copyfile(input_path, md_path)
             print(f"成功将 {input_path} 复制到 {md_path}")
             
             # 读取复制后的文件内容以处理图片
@@ -140,8 +258,7 @@ def convert_file_to_md(input_path, output_dir="converted_data"):
             if image_index:
                 # 生成图片索引文件路径: converted_data/<文件名>/images_index.json
                 image_index_path = os.path.join(file_output_dir, "images_index.json")
-                with open(image_index_path, 'w', encoding='utf-8') as f:
-                    json.dump(image_index, f, ensure_ascii=False, indent=2)
+                save_image_index(image_index, image_index_path, blob_dir)
                 
                 print(f"  ✓ 已保存 {len(image_index)} 张图片的base64编码及索引文件")
                 if image_files_saved:
@@ -149,14 +266,16 @@ def convert_file_to_md(input_path, output_dir="converted_data"):
             else:
                 print("  未检测到图片")
             
+            if use_cache:
+                save_conversion_cache(input_path, file_output_dir, len(image_index), input_stat)
             return True
         except Exception as e:
             print(f"处理.md文件过程中出现错误: {str(e)}")
             return False
     else:
         try:
-            # 创建 MarkItDown 实例
-            md = MarkItDown()
+            # 复用当前线程的 MarkItDown 实例
+            md = get_markitdown()
             
             # 转换文件
             result = md.convert(input_path)
@@ -188,7 +307,7 @@ def convert_file_to_md(input_path, output_dir="converted_data"):
                         image_files_saved.append(image_filename)
                         
                         # 生成base64编码
-                        image_base64 = base64.b64encode(image.data).decode('utf-8')
+                        image_base64 = b64encode(image.data)
                         
                         # 记录图片索引信息
                         image_index[image_filename] = {
@@ -217,8 +336,7 @@ def convert_file_to_md(input_path, output_dir="converted_data"):
             if image_index:
                 # 生成图片索引文件路径: converted_data/<文件名>/images_index.json
                 image_index_path = os.path.join(file_output_dir, "images_index.json")
-                with open(image_index_path, 'w', encoding='utf-8') as f:
-                    json.dump(image_index, f, ensure_ascii=False, indent=2)
+                save_image_index(image_index, image_index_path, blob_dir)
                 
                 print(f"  ✓ 已保存 {len(image_index)} 张图片的base64编码及索引文件")
                 if image_files_saved:
@@ -227,12 +345,103 @@ def convert_file_to_md(input_path, output_dir="converted_data"):
                 print("  未检测到图片")
             
             print(f"成功将 {input_path} 转换为 {md_path}")
+            if use_cache:
+                save_conversion_cache(input_path, file_output_dir, len(image_index), input_stat)
             return True
             
         except Exception as e:
             print(f"转换过程中出现错误: {str(e)}")
             return False
 
+def save_image_stream(src, image_filepath: str) -> Tuple[bytearray, int]:
+    """
+    将图片数据流分块写入文件，同时计算base64编码
+    
+    原始图片数据不会完整地驻留在内存中，编码结果直接累积为ASCII字节
+    
+    Args:
+        src: 可读取的二进制数据流
+        image_filepath (str): 图片保存路径
+        
+    Returns:
+        Tuple[bytearray, int]: base64编码（ASCII字节）和原始数据大小
+    """
+    encoded = bytearray()
+    pending = b''
+    size = 0
+    with open(image_filepath, 'wb') as f:
+        for block in iter(lambda: src.read(BASE64_CHUNK_SIZE), b''):
+            f.write(block)
+            size += len(block)
+            # 数据流可能返回不足一整块的数据，只编码3的倍数部分，余下的留到下一块
+            block = pending + block if pending else block
+            cut = len(block) - len(block) % 3
+            encoded += b64encode(block[:cut])
+            pending = block[cut:]
+    encoded += b64encode(pending)
+    return encoded, size
+
+def base64_json_default(obj):
+    """
+    JSON序列化时处理以ASCII字节保存的base64编码
+    
+    base64字符不需要转义，使用orjson时直接拼接为JSON字符串片段写出，
+    不再生成与图片大小相当的str副本
+    """
+    if isinstance(obj, (bytes, bytearray)):
+        if ORJSON_AVAILABLE and hasattr(orjson, 'Fragment'):
+            return orjson.Fragment(b'"' + obj + b'"')
+        return obj.decode('ascii')
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def store_image_blob(image_base64, blob_dir: str) -> str:
+    """
+    按内容哈希保存图片的base64编码，相同内容只写入一次
+    
+    Args:
+        image_base64: base64编码（str或ASCII字节）
+        blob_dir (str): 共享的base64编码目录
+        
+    Returns:
+        str: 内容哈希，即索引中的 base64_ref
+    """
+    data = image_base64.encode('ascii') if isinstance(image_base64, str) else image_base64
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    blob_path = os.path.join(blob_dir, digest + IMAGE_BLOB_SUFFIX)
+    if not os.path.exists(blob_path):
+        os.makedirs(blob_dir, exist_ok=True)
+        # 先写入临时文件再重命名，并行转换的其他进程不会读到写了一半的文件
+        tmp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, blob_path)
+    return digest
+
+def save_image_index(image_index: Dict, image_index_path: str, blob_dir: Optional[str] = None) -> None:
+    """
+    保存图片索引文件，格式与 json.dump(indent=2, ensure_ascii=False) 一致
+    
+    Args:
+        image_index (Dict): 图片索引信息，base64编码可以是str或ASCII字节
+        image_index_path (str): 索引文件路径
+        blob_dir (str): 共享的base64编码目录，指定时索引中以 base64_ref 引用编码，不再内嵌 base64
+    """
+    if blob_dir:
+        # 保持字段顺序，将 base64 替换为 base64_ref
+        image_index = {
+            image_filename: {
+                ('base64_ref' if key == 'base64' else key): (store_image_blob(value, blob_dir) if key == 'base64' else value)
+                for key, value in image_info.items()
+            }
+            for image_filename, image_info in image_index.items()
+        }
+    if ORJSON_AVAILABLE:
+        with open(image_index_path, 'wb') as f:
+            f.write(orjson.dumps(image_index, default=base64_json_default, option=orjson.OPT_INDENT_2))
+    else:
+        with open(image_index_path, 'w', encoding='utf-8') as f:
+            json.dump(image_index, f, ensure_ascii=False, indent=2, default=base64_json_default)
+
 def extract_images_from_markdown(markdown_content: str, base_filename: str, output_dir: str) -> Tuple[Dict, List]:
     """
     从Markdown内容中提取base64编码的图片并保存原始图片文件
@@ -247,19 +456,17 @@ def extract_images_from_markdown(markdown_content: str, base_filename: str, outp
     """
     image_index = {}
     image_files_saved = []
-    # 匹配Markdown中的base64图片（更宽松的匹配）
-    pattern = r'data:image/[^;]+;base64,([a-zA-Z0-9+/=]+)'
-    matches = re.findall(pattern, markdown_content)
     
-    # 如果上面的模式没有匹配到，尝试更宽松的匹配
-    if not matches:
-        pattern = r'data:image/[a-zA-Z]+;base64,([a-zA-Z0-9+/=]+)'
-        matches = re.findall(pattern, markdown_content)
+    # 大多数文档不含内嵌图片，先用子串查找快速排除，避免正则扫描
+    if 'data:image/' not in markdown_content:
+        return image_index, image_files_saved
     
-    for i, base64_data in enumerate(matches):
+    # 逐个迭代匹配结果，不生成完整的匹配列表
+    for i, match in enumerate(BASE64_IMAGE_PATTERN.finditer(markdown_content)):
+        base64_data = match.group(1)
         try:
             # 解码base64数据
-            image_data = base64.b64decode(base64_data)
+            image_data = b64decode(base64_data)
             
             # 生成图片文件名，添加编号前缀
             image_filename = f"{i+1}_{base_filename}_image.png"
@@ -300,18 +507,15 @@ def extract_images_from_docx(docx_path: str, base_filename: str, output_dir: str
     try:
         # 打开docx文件（docx本质上是一个zip文件）
         with ZipFile(docx_path, 'r') as docx_zip:
-            # 获取所有图片文件
-            image_files = [f for f in docx_zip.namelist() if f.startswith('word/media/')]
+            # 获取所有图片文件（ZipInfo可直接用于打开成员，无需再按名称查找）
+            image_infos = [info for info in docx_zip.infolist() if info.filename.startswith('word/media/')]
             
-            print(f"  从docx文件中检测到 {len(image_files)} 张图片")
+            print(f"  从docx文件中检测到 {len(image_infos)} 张图片")
             
             # 提取每张图片
-            for i, image_file in enumerate(image_files):
-                # 读取图片数据
-                image_data = docx_zip.read(image_file)
-                
+            for i, image_info in enumerate(image_infos):
                 # 获取图片扩展名
-                ext = os.path.splitext(image_file)[1]
+                ext = os.path.splitext(image_info.filename)[1]
                 if not ext:
                     ext = '.png'  # 默认使用png格式
                 
@@ -319,19 +523,16 @@ def extract_images_from_docx(docx_path: str, base_filename: str, output_dir: str
                 image_filename = f"{i+1}_{base_filename}_image{ext}"
                 image_filepath = os.path.join(output_dir, image_filename)
                 
-                # 保存原始图片文件
-                with open(image_filepath, 'wb') as f:
-                    f.write(image_data)
+                # 流式解压图片数据，保存原始图片文件并生成base64编码
+                with docx_zip.open(image_info) as src:
+                    image_base64, image_size = save_image_stream(src, image_filepath)
                 image_files_saved.append(image_filename)
                 
-                # 生成base64编码
-                image_base64 = base64.b64encode(image_data).decode('utf-8')
-                
                 # 记录图片索引信息
                 image_index[image_filename] = {
                     "image_id": i+1,
                     "base64": image_base64,
-                    "size": len(image_data),
+                    "size": image_size,
                     "filepath": image_filename  # 添加文件路径信息
                 }
     except Exception as e:
@@ -354,10 +555,6 @@ def extract_images_from_pdf(pdf_path: str, base_filename: str, output_dir: str)
     image_index = {}
     image_files_saved = []
     
-    if not PDF_SUPPORTED:
-        print("  警告: 未安装PyMuPDF库，无法从PDF文件中提取图片")
-        return image_index, image_files_saved
-    
     # 只有在PDF支持可用时才处理PDF文件
     if not PDF_SUPPORTED:
         print("  警告: 未安装PyMuPDF库，无法从PDF文件中提取图片")
@@ -365,51 +562,54 @@ def extract_images_from_pdf(pdf_path: str, base_filename: str, output_dir: str)
     
     try:
         # 打开PDF文件
-        import pymupdf  # PyMuPDF
         doc = pymupdf.open(pdf_path)
         
-        image_count = 0
+        # 按页面顺序收集所有图片的xref
+        xrefs = [img[0] for page_num in range(len(doc)) for img in doc.get_page_images(page_num)]
+        
+        # 同一图片（如每页重复的logo）在多个页面引用时只解码一次，
+        # 结果保留到该图片最后一次出现后释放
+        remaining_uses = Counter(xrefs)
+        decoded_cache = {}
         
-        # 遍历每一页
-        for page_num in range(len(doc)):
-            # 获取页面中的图片列表
-            image_list = doc.get_page_images(page_num)
+        image_count = 0
+        for xref in xrefs:
+            # 生成图片文件名，添加编号前缀
+            image_count += 1
+            image_filename = f"{image_count}_{base_filename}_image.png"
+            image_filepath = os.path.join(output_dir, image_filename)
             
-            for image_index_in_page, img in enumerate(image_list, start=1):
+            if xref in decoded_cache:
+                image_data, image_base64 = decoded_cache[xref]
+            else:
                 # 提取图片数据
-                xref = img[0]
                 pix = pymupdf.Pixmap(doc, xref)
-                
-                # 生成图片文件名，添加编号前缀
-                image_count += 1
-                image_filename = f"{image_count}_{base_filename}_image.png"
-                image_filepath = os.path.join(output_dir, image_filename)
-                
-                # 获取图片数据
-                if pix.n < 5:  # 如果不是CMYK格式，直接获取数据
-                    image_data = pix.tobytes()
-                else:  # 如果是CMYK格式，转换为RGB再获取数据
+                if pix.n >= 5:  # 如果是CMYK格式，转换为RGB再获取数据
                     pix = pymupdf.Pixmap(pymupdf.csRGB, pix)
-                    image_data = pix.tobytes()
-                
-                # 保存原始图片文件
-                with open(image_filepath, 'wb') as f:
-                    f.write(image_data)
-                image_files_saved.append(image_filename)
-                
-                # 生成base64编码
-                image_base64 = base64.b64encode(image_data).decode('utf-8')
-                
-                # 记录图片索引信息
-                image_index[image_filename] = {
-                    "image_id": image_count,
-                    "base64": image_base64,
-                    "size": len(image_data),
-                    "filepath": image_filename  # 添加文件路径信息
-                }
-                
-                # 释放资源
-                pix = None
+                image_data = pix.tobytes()
+                # 取出数据后立即释放Pixmap，不让其存活到下一张图片
+                del pix
+                image_base64 = b64encode(image_data)
+                if remaining_uses[xref] > 1:
+                    decoded_cache[xref] = (image_data, image_base64)
+            
+            remaining_uses[xref] -= 1
+            if remaining_uses[xref] == 0:
+                decoded_cache.pop(xref, None)
+            
+            # 保存原始图片文件
+            with open(image_filepath, 'wb') as f:
+                f.write(image_data)
+            image_files_saved.append(image_filename)
+            
+            # 记录图片索引信息
+            image_index[image_filename] = {
+                "image_id": image_count,
+                "base64": image_base64,
+                "size": len(image_data),
+                "filepath": image_filename  # 添加文件路径信息
+            }
+            del image_data
         
         doc.close()
         
@@ -420,34 +620,49 @@ def extract_images_from_pdf(pdf_path: str, base_filename: str, output_dir: str)
     
     return image_index, image_files_saved
 
-def convert_all_files_in_directory(input_dir="doc_Data", output_dir="md_ConvertResult"):
+def convert_all_files_in_directory(input_dir="doc_Data", output_dir="md_ConvertResult", max_workers: Optional[int] = None):
     """
     转换指定目录中的所有支持的文件
     
+    各文件的转换相互独立，且以CPU计算为主，使用进程池并行转换
+    
     Args:
         input_dir (str): 输入目录路径
         output_dir (str): 输出目录路径
+        max_workers (int): 并行转换的进程数（默认: CPU核心数）
     """
     # 构建完整的输入目录路径（使用相对于脚本的路径）
     input_dir = os.path.join(script_dir, input_dir)
     
-    if not os.path.exists(input_dir):
+    # 获取目录中所有支持的文件（DirEntry自带类型信息，无需逐个stat）
+    try:
+        with os.scandir(input_dir) as it:
+            file_paths = [entry.path for entry in it if entry.is_file() and is_supported_file(entry.name)]
+    except FileNotFoundError:
         print(f"错误: 输入目录 {input_dir} 不存在")
         return
     
-    # 获取目录中所有支持的文件
-    supported_files = [f for f in os.listdir(input_dir) if is_supported_file(f)]
-    
-    if not supported_files:
+    if not file_paths:
         print(f"在目录 {input_dir} 中未找到支持的文件")
         return
     
-    print(f"找到 {len(supported_files)} 个支持的文件，开始转换...")
+    print(f"找到 {len(file_paths)} 个支持的文件，开始转换...")
     
-    # 转换每个文件
-    for filename in supported_files:
-        file_path = os.path.join(input_dir, filename)
-        convert_file_to_md(file_path, output_dir)
+    # 只有一个文件时直接转换，避免创建进程池的开销
+    if len(file_paths) == 1 or max_workers == 1:
+        success_count = sum(1 for file_path in file_paths if convert_file_to_md(file_path, output_dir, use_cache=True))
+    else:
+        success_count = 0
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_converter) as pool:
+            futures = {pool.submit(convert_file_to_md, file_path, output_dir, use_cache=True): file_path for file_path in file_paths}
+            for future in as_completed(futures):
+                try:
+                    if future.result():
+                        success_count += 1
+                except Exception as e:
+                    print(f"转换 {futures[future]} 时出现错误: {str(e)}")
+    
+    print(f"转换完成: {success_count}/{len(file_paths)} 个文件转换成功")
 
 if __name__ == "__main__":
     # 尝试从配置文件加载参数
@@ -461,6 +676,7 @@ if __name__ == "__main__":
     parser.add_argument('-i', '--input', default=default_input_path, help=f'输入目录路径或单个文件路径（默认: {default_input_path}）')
     parser.add_argument('-o', '--output', default=default_output_path, help=f'输出目录路径（默认: {default_output_path}）')
     parser.add_argument('--config', help='配置文件路径')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='转换目录时的并行进程数（默认: CPU核心数）')
     
     args = parser.parse_args()
     
@@ -480,10 +696,10 @@ if __name__ == "__main__":
     # 检查是否为单个文件
     if os.path.isfile(input_path) and is_supported_file(input_path):
         # 处理单个文件
-        convert_file_to_md(input_path, args.output)
+        convert_file_to_md(input_path, args.output, use_cache=True)
     elif os.path.isfile(args.input) and is_supported_file(args.input):
         # 如果提供了绝对路径或相对路径的文件
-        convert_file_to_md(args.input, args.output)
+        convert_file_to_md(args.input, args.output, use_cache=True)
     else:
         # 处理目录
-        convert_all_files_in_directory(args.input, args.output)
+        convert_all_files_in_directory(args.input, args.output, args.workers)
@@ -0,0 +1,36 @@
+"""
+gunicorn 配置文件
+
+启动方式: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+
+bind = "0.0.0.0:5000"
+
+# 每个CPU核心一个worker进程，worker内使用线程重叠上传、下载等I/O
+workers = int(os.environ.get("GUNICORN_WORKERS", os.cpu_count() or 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# 大文档的转换、分块和合并可能耗时较长
+timeout = 300
+graceful_timeout = 30
+
+accesslog = "-"
+errorlog = "-"
+
+# 每个worker都会创建自己的转换进程池，限制单个进程池大小以免进程数随worker数成倍增长
+raw_env = [f"CONVERT_POOL_SIZE={os.environ.get('CONVERT_POOL_SIZE', 2)}"]
+
+
+def when_ready(server):
+    """
+    master进程就绪后启动唯一的临时文件清理线程（fork出的worker不会继承该线程）
+
+    只导入轻量的cleanup模块，master进程不加载Flask应用及文档处理依赖
+    """
+    import logging
+    from cleanup import LOG_FORMAT, start_cleanup_thread
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    start_cleanup_thread()
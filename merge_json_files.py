@@ -10,15 +10,56 @@ that contains both text chunks and images in document order.
 
 import os
 import json
-import base64
 import argparse
 import re
+import mmap
+import shutil
+from functools import lru_cache
 from pathlib import Path
 
+# 可选：使用ijson增量解析chunk_index.json，避免整个文件驻留内存
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
+# 可选：使用orjson直接从字节解析JSON，省去先解码为str的一遍处理
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 可选：使用pybase64（SIMD实现）进行base64编解码，接口与标准库一致
+try:
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+# orjson 3.10+ 可以直接写出预先编码好的JSON片段
+FRAGMENT_AVAILABLE = ORJSON_AVAILABLE and hasattr(orjson, 'Fragment')
+
+# convert_doc_to_md 按内容哈希保存图片base64编码的共享目录（位于converted_data下）
+IMAGE_BLOB_DIRNAME = "_blobs"
+IMAGE_BLOB_SUFFIX = ".b64"
+
+# 默认合并参数，配置文件中缺少的项使用这里的值
+DEFAULT_MERGE_CONFIG = {
+    "default_input_converted_path": "converted_data",
+    "default_input_sliced_path": "sliced_data",
+    "default_output_path": "merged_data",
+    "enable_base64_processing": True,
+    "save_merged_index": False,
+    "merged_index_filename": "merged_index.json",
+    "compact_json": False
+}
+
+
+@lru_cache(maxsize=32)
 def find_config_file(config_file: str, script_dir: str) -> str:
     """
-    动态查找配置文件路径
+    动态查找配置文件路径（同一进程内结果不变，缓存查找结果）
     
     Args:
         config_file: 配置文件名
@@ -42,6 +83,26 @@ def find_config_file(config_file: str, script_dir: str) -> str:
     return config_file  # 返回原始路径，让系统决定
 
 
+@lru_cache(maxsize=32)
+def read_config_file(config_path: str):
+    """
+    读取并解析配置文件，同一路径只解析一次
+    
+    Args:
+        config_path: 配置文件的绝对路径
+        
+    Returns:
+        配置字典，文件不存在或解析失败时返回None
+    """
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"读取配置文件时出错: {str(e)}，使用默认参数")
+    return None
+
+
 def load_merge_config(config_file: str = "merge_config.json") -> dict:
     """
     从配置文件加载合并参数
@@ -56,63 +117,173 @@ def load_merge_config(config_file: str = "merge_config.json") -> dict:
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
     # 动态查找配置文件
-    config_path = find_config_file(config_file, script_dir)
+    config_path = os.path.abspath(find_config_file(config_file, script_dir))
     
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            return config
-        except Exception as e:
-            print(f"读取配置文件时出错: {str(e)}，使用默认参数")
-    
-    # 默认参数
-    return {
-        "default_input_converted_path": "converted_data",
-        "default_input_sliced_path": "sliced_data",
-        "default_output_path": "merged_data",
-        "enable_base64_processing": True,
-        "save_merged_index": False,
-        "merged_index_filename": "merged_index.json"
-    }
+    # 返回新字典，调用方修改时不影响缓存；缺少的项使用默认参数
+    config = read_config_file(config_path)
+    return {**DEFAULT_MERGE_CONFIG, **(config or {})}
 
 
 def load_json_file(file_path):
     """Load JSON file and return its content."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            # 映射到内存后直接在页缓存上解析，不额外复制一份文件内容
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if ORJSON_AVAILABLE:
+                    with memoryview(mm) as view:
+                        return orjson.loads(view)
+                return json.loads(mm[:])
     except Exception as e:
         print(f"Error loading {file_path}: {e}")
         return None
 
 
-def save_json_file(data, file_path):
+# 写入result.json时使用的缓冲区大小
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+def dumps_json_bytes(data, compact=False):
+    """
+    Serialize data to UTF-8 JSON bytes in one call.
+
+    Args:
+        data: Data to serialize
+        compact (bool): Omit indentation and whitespace (default: indent=2)
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def save_json_file(data, file_path, compact=False):
     """Save data to JSON file."""
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 先整体序列化再一次写入，避免逐段写入文本层
+        payload = dumps_json_bytes(data, compact)
+        with open(file_path, 'wb') as f:
+            f.write(payload)
         return True
     except Exception as e:
         print(f"Error saving {file_path}: {e}")
         return False
 
 
+def iter_json_array(file_path):
+    """Yield the items of a top-level JSON array one at a time."""
+    with open(file_path, 'rb') as f:
+        if IJSON_AVAILABLE:
+            yield from ijson.items(f, 'item', use_float=True)
+        else:
+            yield from json.load(f)
+
+
+def save_json_array(items, file_path, compact=False):
+    """
+    Write items to a JSON array file as they are produced.
+
+    The output matches save_json_file(list(items), compact=compact). Items are
+    written to a temporary file that replaces file_path only once every item
+    has been written, so a failure while producing them (e.g. a truncated
+    chunk_index.json) never leaves a partial file behind.
+
+    Returns:
+        int: Number of items written, or None on failure
+    """
+    count = 0
+    if compact:
+        first_sep, sep, end = b'[', b',', b']'
+    else:
+        first_sep, sep, end = b'[\n  ', b',\n  ', b'\n]'
+    tmp_path = file_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            for item in items:
+                f.write(first_sep if count == 0 else sep)
+                payload = dumps_json_bytes(item, compact)
+                # 字符串中的换行已被转义，只需整体缩进一级
+                f.write(payload if compact else payload.replace(b'\n', b'\n  '))
+                count += 1
+            f.write(end if count else b'[]')
+        os.replace(tmp_path, file_path)
+        return count
+    except Exception as e:
+        print(f"Error saving {file_path}: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return None
+
+
+def base64_json_value(base64_data):
+    """
+    Wrap a base64 string as a pre-encoded JSON fragment when possible.
+
+    base64 text never needs escaping, so the JSON string is built by plain
+    concatenation once per image and copied verbatim into every result.json
+    item that references it, instead of being re-scanned by the serializer.
+    """
+    if (FRAGMENT_AVAILABLE and isinstance(base64_data, str) and base64_data.isascii()
+            and base64_data.isprintable() and '"' not in base64_data and '\\' not in base64_data):
+        return orjson.Fragment(b'"' + base64_data.encode('ascii') + b'"')
+    return base64_data
+
+
+def load_image_blob(blob_path):
+    """Load a content-addressed base64 blob as a JSON value."""
+    with open(blob_path, 'rb') as f:
+        return base64_json_value(f.read().decode('ascii'))
+
+
+def image_base64_value(image_info, blob_dir, blob_cache=None):
+    """
+    Return the base64 JSON value of an images_index.json entry, inline or via base64_ref.
+
+    blob_cache maps base64_ref to the loaded value. merge_document_data passes one
+    dict per call, so images shared by several documents (logos, headers) are
+    read from disk once per batch and released when the batch is done.
+    """
+    if image_info.get('base64') is not None:
+        return base64_json_value(image_info['base64'])
+    ref = image_info.get('base64_ref')
+    # 引用必须是十六进制哈希，防止拼接出共享目录之外的路径
+    if not isinstance(ref, str) or not ref.isalnum():
+        return None
+    if blob_cache is not None and ref in blob_cache:
+        return blob_cache[ref]
+    try:
+        value = load_image_blob(os.path.join(blob_dir, ref + IMAGE_BLOB_SUFFIX))
+    except Exception as e:
+        print(f"  Warning: Failed to load image blob {ref}: {e}")
+        return None
+    if blob_cache is not None:
+        blob_cache[ref] = value
+    return value
+
+
 def load_image_as_base64(image_path):
     """Load image file and return its base64 encoding."""
     try:
         with open(image_path, 'rb') as f:
-            return base64.b64encode(f.read()).decode('utf-8')
+            return b64encode(f.read()).decode('utf-8')
     except Exception as e:
         print(f"Error loading image {image_path}: {e}")
         return None
 
 
+# Markdown image syntax with an embedded base64 data URI; group 1 is the base64 data
+BASE64_IMAGE_PLACEHOLDER = re.compile(r'!\[.*?\]\(data:image/.*?;base64,([^)]+)\)')
+
+
 def extract_base64_from_text(text):
     """Extract base64 data from markdown image syntax in text."""
-    pattern = r'!\[.*?\]\(data:image/.*?;base64,([^)]+)\)'
-    matches = re.findall(pattern, text)
-    return matches
+    return BASE64_IMAGE_PLACEHOLDER.findall(text)
 
 
 def process_text_with_base64_images(items):
@@ -125,39 +296,52 @@ def process_text_with_base64_images(items):
     
     for item in items:
         if item['type'] == 'text' and item.get('content'):
-            # Check if text contains base64 image placeholders
-            base64_matches = extract_base64_from_text(item['content'])
+            content = item['content']
             
-            if base64_matches:
-                # Split text by base64 placeholders
-                parts = re.split(r'!\[.*?\]\(data:image/.*?;base64,[^)]+\)', item['content'])
+            # Walk the base64 image placeholders once, emitting the text before
+            # each placeholder followed by the image it contains
+            last_end = 0
+            found = False
+            # Cheap substring check first: text without a data URI cannot match
+            matches = BASE64_IMAGE_PLACEHOLDER.finditer(content) if 'data:image/' in content else ()
+            for match in matches:
+                found = True
+                # Add text part if it's not empty
+                part = content[last_end:match.start()].strip()
+                if part:
+                    processed_items.append({
+                        'id': id_counter,
+                        'type': 'text',
+                        'title': item.get('title', ''),
+                        'content': part,
+                        'length': len(part)
+                    })
+                    id_counter += 1
                 
-                # Process each part and insert images where placeholders were
-                for i, part in enumerate(parts):
-                    # Add text part if it's not empty
-                    if part.strip():
-                        text_item = {
-                            'id': id_counter,
-                            'type': 'text',
-                            'title': item.get('title', ''),
-                            'content': part.strip(),
-                            'length': len(part.strip())
-                        }
-                        processed_items.append(text_item)
-                        id_counter += 1
-                    
-                    # Add image item if there's a corresponding base64 match
-                    if i < len(base64_matches):
-                        image_item = {
-                            'id': id_counter,
-                            'type': 'image',
-                            'base64': base64_matches[i],
-                            'original_name': f"embedded_image_{id_counter}.png",
-                            'path': f"embedded_images/embedded_image_{id_counter}.png",
-                            'size': len(base64_matches[i])
-                        }
-                        processed_items.append(image_item)
-                        id_counter += 1
+                base64_data = match.group(1)
+                processed_items.append({
+                    'id': id_counter,
+                    'type': 'image',
+                    'base64': base64_data,
+                    'original_name': f"embedded_image_{id_counter}.png",
+                    'path': f"embedded_images/embedded_image_{id_counter}.png",
+                    'size': len(base64_data)
+                })
+                id_counter += 1
+                last_end = match.end()
+            
+            if found:
+                # Add the text after the last placeholder
+                part = content[last_end:].strip()
+                if part:
+                    processed_items.append({
+                        'id': id_counter,
+                        'type': 'text',
+                        'title': item.get('title', ''),
+                        'content': part,
+                        'length': len(part)
+                    })
+                    id_counter += 1
             else:
                 # No base64 placeholders, keep the item as is
                 item['id'] = id_counter
@@ -185,27 +369,22 @@ def find_document_files(converted_dir, sliced_dir):
     """
     document_files = {}
     
-    # 遍历sliced_data目录中的所有子目录，因为这是处理流程的最后一步
-    # 即使没有图片，也应该处理这些文档
-    for root, dirs, files in os.walk(sliced_dir):
-        for dir_name in dirs:
-            # 检查是否存在chunk_index.json文件
-            chunk_index_path = os.path.join(root, dir_name, 'chunk_index.json')
-            if os.path.exists(chunk_index_path):
-                doc_name = dir_name
-                if doc_name not in document_files:
-                    document_files[doc_name] = {}
-                document_files[doc_name]['chunk_index'] = chunk_index_path
-                
-                # 检查是否存在images_index.json文件
-                images_index_path = os.path.join(converted_dir, doc_name, 'images_index.json')
-                if os.path.exists(images_index_path):
-                    document_files[doc_name]['images_index'] = images_index_path
+    # 以sliced_data目录为准，因为这是处理流程的最后一步，即使没有图片也应该处理这些文档
+    # chunk_index.json总是位于sliced_data/<文档名>/下，只需检查第一层子目录
+    for chunk_index in Path(sliced_dir).glob('*/chunk_index.json'):
+        doc_name = chunk_index.parent.name
+        document_files[doc_name] = {'chunk_index': str(chunk_index)}
+        
+        # 检查是否存在images_index.json文件
+        images_index_path = os.path.join(converted_dir, doc_name, 'images_index.json')
+        if os.path.exists(images_index_path):
+            document_files[doc_name]['images_index'] = images_index_path
     
     return document_files
 
 
-def merge_document_data(converted_dir, sliced_dir, output_dir, enable_base64_processing=True, save_merged_index=False):
+def merge_document_data(converted_dir, sliced_dir, output_dir, enable_base64_processing=True, save_merged_index=False,
+                        doc_names=None, compact_json=False):
     """
     Merge converted_data and sliced_data JSON files for all documents.
     
@@ -215,17 +394,28 @@ def merge_document_data(converted_dir, sliced_dir, output_dir, enable_base64_pro
         output_dir (str): Path to output directory
         enable_base64_processing (bool): Whether to process base64 image placeholders
         save_merged_index (bool): Whether to save the merged index file
+        doc_names (list): Only merge the documents with these names (default: all documents)
+        compact_json (bool): Write result.json without indentation (smaller, not meant for humans)
+    
+    Returns:
+        list: (doc_name, result.json path) for every document that was saved
     """
     # Create output directory if it doesn't exist
     Path(output_dir).mkdir(parents=True, exist_ok=True)
     
     # Find all document files in the new directory structure
     document_files = find_document_files(converted_dir, sliced_dir)
+    if doc_names is not None:
+        selected = set(doc_names)
+        document_files = {name: files for name, files in document_files.items() if name in selected}
     
     print(f"Found {len(document_files)} documents to process")
     
     # 用于保存所有合并文件的索引
     merged_index = {}
+    merged_files = []
+    # 本次合并中已读取的共享图片base64编码，多个文档引用同一图片时只读取一次
+    blob_cache = {}
     
     for doc_name, files in document_files.items():
         print(f"Processing: {doc_name}")
@@ -235,35 +425,34 @@ def merge_document_data(converted_dir, sliced_dir, output_dir, enable_base64_pro
         if 'images_index' in files:
             image_index_data = load_json_file(files['images_index']) or {}
             
-        # Load chunk_index.json
+        # chunk_index.json is streamed item by item while result.json is written
         chunk_index_path = files['chunk_index']
-        chunk_index_data = load_json_file(chunk_index_path)
-        if chunk_index_data is None:
+        if not os.path.isfile(chunk_index_path):
             print(f"  Warning: chunk_index.json not found for {doc_name}")
             continue
             
-        # Create a mapping from image_id to base64 data
-        image_id_to_base64 = {}
-        for image_filename, image_info in image_index_data.items():
-            image_id = image_info.get('image_id')
-            base64_data = image_info.get('base64')
-            if image_id is not None and base64_data is not None:
-                image_id_to_base64[image_id] = base64_data
+        # Create a mapping from image_id to base64 data; entries written with
+        # base64_ref are resolved from the shared blob directory
+        blob_dir = os.path.join(converted_dir, IMAGE_BLOB_DIRNAME)
+        image_id_to_base64 = {
+            image_info['image_id']: base64_data
+            for image_info in image_index_data.values()
+            if image_info.get('image_id') is not None
+            and (base64_data := image_base64_value(image_info, blob_dir, blob_cache)) is not None
+        }
                 
-        # Process chunk_index_data to add base64 data where image_id matches
-        merged_data = []
-        for chunk in chunk_index_data:
-            # Copy the original chunk data
-            new_chunk = chunk.copy()
-            
-            # If this chunk has an image_id, check if we have base64 data for it
-            if 'image_id' in chunk:
-                image_id = chunk['image_id']
-                if image_id in image_id_to_base64:
-                    # Add the base64 data to this chunk
-                    new_chunk['base64'] = image_id_to_base64[image_id]
-                    
-            merged_data.append(new_chunk)
+        # Process chunks to add base64 data where image_id matches; chunks are
+        # modified in place since each one is discarded once it has been written
+        def merged_chunks():
+            for chunk in iter_json_array(chunk_index_path):
+                # If this chunk has an image_id, check if we have base64 data for it
+                if 'image_id' in chunk:
+                    # A single lookup instead of a membership test plus indexing
+                    base64_data = image_id_to_base64.get(chunk['image_id'])
+                    if base64_data is not None:
+                        # Add the base64 data to this chunk
+                        chunk['base64'] = base64_data
+                yield chunk
             
         # 修改保存逻辑：为每个文档创建单独的文件夹，并在其中保存result.json
         # 创建文档对应的文件夹
@@ -283,7 +472,6 @@ def merge_document_data(converted_dir, sliced_dir, output_dir, enable_base64_pro
                     if os.path.isfile(item_path) and not item.endswith('.json') and not item.endswith('.md'):
                         dest_path = os.path.join(doc_output_dir, item)
                         try:
-                            import shutil
                             shutil.copy2(item_path, dest_path)
                             print(f"  Copied image: {item}")
                         except Exception as e:
@@ -291,13 +479,15 @@ def merge_document_data(converted_dir, sliced_dir, output_dir, enable_base64_pro
         
         # 在文档文件夹中保存result.json
         output_file = os.path.join(doc_output_dir, "result.json")
-        if save_json_file(merged_data, output_file):
+        items_count = save_json_array(merged_chunks(), output_file, compact_json)
+        if items_count is not None:
             print(f"  Saved: {output_file}")
+            merged_files.append((doc_name, output_file))
             # 添加到合并索引
             if save_merged_index:
                 merged_index[doc_name] = {
                     "file": f"{doc_name}/result.json",
-                    "items_count": len(merged_data)
+                    "items_count": items_count
                 }
         else:
             print(f"  Failed to save: {output_file}")
@@ -305,8 +495,10 @@ def merge_document_data(converted_dir, sliced_dir, output_dir, enable_base64_pro
     # 保存合并索引文件
     if save_merged_index and merged_index:
         index_file = os.path.join(output_dir, "merged_index.json")
-        if save_json_file(merged_index, index_file):
+        if save_json_file(merged_index, index_file, compact_json):
             print(f"  Saved merged index: {index_file}")
+    
+    return merged_files
 
 
 def main():
@@ -314,32 +506,17 @@ def main():
     print("🙌 JSON文件合并工具")
     print("=" * 40)
     
-    # 获取当前脚本的目录
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # 尝试从配置文件加载参数
-    config = load_merge_config()
-    print(f"⚙️  已加载配置参数")
-    
-    # 从配置文件获取默认输入输出路径
-    default_converted_path = config.get("default_input_converted_path", "converted_data")
-    default_sliced_path = config.get("default_input_sliced_path", "sliced_data")
-    default_output_path = config.get("default_output_path", "merged_data")
-    default_enable_base64_processing = config.get("enable_base64_processing", True)
-    default_save_merged_index = config.get("save_merged_index", False)
-    default_merged_index_filename = config.get("merged_index_filename", "merged_index.json")
-    
+    # 命令行参数默认为None，表示未指定，此时使用配置文件中的参数
     parser = argparse.ArgumentParser(description='Merge converted_data and sliced_data JSON files')
-    parser.add_argument('--converted-dir', default=default_converted_path,
-                        help=f'Path to converted_data directory (default: {default_converted_path})')
-    parser.add_argument('--sliced-dir', default=default_sliced_path,
-                        help=f'Path to sliced_data directory (default: {default_sliced_path})')
-    parser.add_argument('--output-dir', default=default_output_path,
-                        help=f'Path to output directory (default: {default_output_path})')
-    parser.add_argument('--enable-base64-processing', action='store_true', 
-                        default=default_enable_base64_processing,
-                        help=f'Enable base64 image processing (default: {default_enable_base64_processing})')
-    parser.add_argument('--disable-base64-processing', action='store_false', 
+    parser.add_argument('--converted-dir', dest='default_input_converted_path',
+                        help='Path to converted_data directory (default: from config file)')
+    parser.add_argument('--sliced-dir', dest='default_input_sliced_path',
+                        help='Path to sliced_data directory (default: from config file)')
+    parser.add_argument('--output-dir', dest='default_output_path',
+                        help='Path to output directory (default: from config file)')
+    parser.add_argument('--enable-base64-processing', action='store_true', default=None,
+                        help='Enable base64 image processing')
+    parser.add_argument('--disable-base64-processing', action='store_false',
                         dest='enable_base64_processing',
                         help='Disable base64 image processing')
     parser.add_argument('--save-merged-index', action='store_true',
@@ -348,55 +525,49 @@ def main():
     parser.add_argument('--no-save-merged-index', action='store_false',
                         dest='save_merged_index',
                         help='Do not save merged index file')
+    parser.add_argument('--compact-json', action='store_true', default=None,
+                        help='Write result.json without indentation')
     parser.add_argument('--config', help='Configuration file path')
     
     args = parser.parse_args()
     
-    # 处理save_merged_index参数
-    if args.save_merged_index is not None:
-        # 如果命令行参数指定了save_merged_index，则使用命令行参数
-        save_merged_index = args.save_merged_index
-    else:
-        # 否则从配置文件获取参数
-        if args.config:
-            print(f"📄 使用指定配置文件: {args.config}")
-            config = load_merge_config(args.config)
-            # 如果命令行参数没有指定，则使用配置文件中的参数
-            if args.converted_dir == default_converted_path:  # 默认值
-                args.converted_dir = config.get("default_input_converted_path", "converted_data")
-            if args.sliced_dir == default_sliced_path:  # 默认值
-                args.sliced_dir = config.get("default_input_sliced_path", "sliced_data")
-            if args.output_dir == default_output_path:  # 默认值
-                args.output_dir = config.get("default_output_path", "merged_data")
-            if args.enable_base64_processing == default_enable_base64_processing:  # 默认值
-                args.enable_base64_processing = config.get("enable_base64_processing", True)
-            # 从配置文件获取save_merged_index参数
-            save_merged_index = config.get("save_merged_index", False)
-        else:
-            # 如果没有指定配置文件，则直接从主配置获取参数
-            save_merged_index = config.get("save_merged_index", False)
+    # 只加载一次配置：命令行参数 > 配置文件 > 默认参数
+    if args.config:
+        print(f"📄 使用指定配置文件: {args.config}")
+    config = load_merge_config(args.config or "merge_config.json")
+    print(f"⚙️  已加载配置参数")
+    config.update({key: value for key, value in vars(args).items() if value is not None and key != 'config'})
+    
+    converted_dir = config["default_input_converted_path"]
+    sliced_dir = config["default_input_sliced_path"]
+    output_dir = config["default_output_path"]
+    enable_base64_processing = config["enable_base64_processing"]
+    save_merged_index = config["save_merged_index"]
+    compact_json = config["compact_json"]
     
     # 显示当前使用的参数
     print(f"📊 当前参数设置:")
-    print(f"   转换数据目录: {args.converted_dir}")
-    print(f"   切片数据目录: {args.sliced_dir}")
-    print(f"   输出目录: {args.output_dir}")
-    print(f"   Base64处理: {'启用' if args.enable_base64_processing else '禁用'}")
+    print(f"   转换数据目录: {converted_dir}")
+    print(f"   切片数据目录: {sliced_dir}")
+    print(f"   输出目录: {output_dir}")
+    print(f"   Base64处理: {'启用' if enable_base64_processing else '禁用'}")
     print(f"   保存合并索引: {'启用' if save_merged_index else '禁用'}")
+    print(f"   紧凑JSON: {'启用' if compact_json else '禁用'}")
     
     # Check if directories exist
-    if not os.path.exists(args.converted_dir):
-        print(f"Error: Converted data directory '{args.converted_dir}' does not exist")
+    if not os.path.exists(converted_dir):
+        print(f"Error: Converted data directory '{converted_dir}' does not exist")
         return
         
-    if not os.path.exists(args.sliced_dir):
-        print(f"Error: Sliced data directory '{args.sliced_dir}' does not exist")
+    if not os.path.exists(sliced_dir):
+        print(f"Error: Sliced data directory '{sliced_dir}' does not exist")
         return
     
     print("Starting merge process...")
-    merge_document_data(args.converted_dir, args.sliced_dir, args.output_dir, args.enable_base64_processing, save_merged_index)
+    merge_document_data(converted_dir, sliced_dir, output_dir, enable_base64_processing, save_merged_index,
+                        compact_json=compact_json)
     print("Merge process completed.")
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -5,35 +5,85 @@
 使用File/temp/test_user下的实际文档进行测试
 """
 
+import codecs
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
 import time
+import shutil
+from contextlib import ExitStack
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import quote
 
+# 可选：使用orjson直接从响应字节解析JSON
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # 服务配置
 BASE_URL = "http://localhost:5000"
 # TEST_DATA_DIR = "../../File/temp/test_user/test_knowledge_base"  # 相对于test目录的路径
 TEST_DATA_DIR = "/home/lynn/projects/filesfromWork/new_project/docuprocessor/raw_data"  # 测试用的路径
 
-def check_service_health():
-    """检查服务健康状态"""
+# 等待服务就绪的最长时间和健康检查的重试间隔（秒）
+SERVICE_READY_TIMEOUT = 10
+SERVICE_POLL_INTERVAL = 0.05
+
+# 轮询异步任务状态的间隔和最长等待时间（秒）
+TASK_POLL_INTERVAL = 0.5
+TASK_POLL_TIMEOUT = 300
+
+# 下载结果文件时每次复制的块大小
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# 结果预览显示的字符数
+PREVIEW_LENGTH = 1000
+
+# 所有请求共用一个会话，复用keep-alive连接，避免每个请求重新建立TCP连接
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+
+def response_json(response):
+    """解析响应中的JSON，orjson可用时直接解析响应字节"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+@lru_cache(maxsize=256)
+def quote_filename(filename):
+    """URL编码结果文件名（处理路径分隔符和中文字符），同一文件名只编码一次"""
+    return quote(filename, safe='')
+
+def check_service_health(timeout=SERVICE_READY_TIMEOUT):
+    """
+    检查服务健康状态
+    
+    服务可能仍在启动，每隔 SERVICE_POLL_INTERVAL 秒重试一次，
+    服务就绪后立即返回，超过timeout秒仍未就绪时判定失败
+    """
     print("正在检查服务健康状态...")
-    try:
-        response = requests.get(f"{BASE_URL}/health", timeout=5)
-        if response.status_code == 200:
-            print("✓ 服务运行正常")
-            return True
-        else:
-            print(f"✗ 服务异常: {response.status_code}")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = SESSION.get(f"{BASE_URL}/health", timeout=5)
+            if response.status_code == 200:
+                print("✓ 服务运行正常")
+                return True
+            error_message = f"✗ 服务异常: {response.status_code}"
+        except requests.exceptions.ConnectionError:
+            error_message = "✗ 无法连接到服务，请确保服务已启动"
+        except Exception as e:
+            error_message = f"✗ 检查服务时发生错误: {str(e)}"
+        
+        if time.monotonic() >= deadline:
+            print(error_message)
             return False
-    except requests.exceptions.ConnectionError:
-        print("✗ 无法连接到服务，请确保服务已启动")
-        return False
-    except Exception as e:
-        print(f"✗ 检查服务时发生错误: {str(e)}")
-        return False
+        time.sleep(SERVICE_POLL_INTERVAL)
 
 def get_test_files():
     """获取测试文件列表"""
@@ -60,10 +110,10 @@ def test_single_document(file_path):
         with open(file_path, 'rb') as f:
             files = {'file': (file_path.name, f)}
             print(f"正在处理文件: {file_path.name}")
-            response = requests.post(f"{BASE_URL}/api/v1/process-document", files=files)
+            response = SESSION.post(f"{BASE_URL}/api/v1/process-document", files=files)
         
         if response.status_code == 200:
-            result = response.json()
+            result = response_json(response)
             print("✓ 文档处理成功")
             print(f"  任务ID: {result['task_id']}")
             print(f"  结果文件: {result['result_file']}")
@@ -77,25 +127,106 @@ def test_single_document(file_path):
         print(f"✗ 处理文档时发生错误: {str(e)}")
         return None
 
+def test_stream_upload(file_path):
+    """测试流式上传处理（请求体直接从文件分块读取发送，不在内存中构建multipart）"""
+    print(f"\n=== 测试流式上传处理: {file_path.name} ===")
+    
+    try:
+        with open(file_path, 'rb') as f:
+            print(f"正在流式上传文件: {file_path.name}")
+            # 文件名可能包含中文，通过查询参数传递（请求头只支持latin-1）
+            response = SESSION.post(
+                f"{BASE_URL}/api/v1/upload-stream",
+                params={'filename': file_path.name},
+                data=f,
+                headers={'Content-Type': 'application/octet-stream'}
+            )
+        
+        if response.status_code == 200:
+            result = response_json(response)
+            print("✓ 流式上传处理成功")
+            print(f"  任务ID: {result['task_id']}")
+            print(f"  结果文件: {result['result_files']}")
+            return result
+        else:
+            print(f"✗ 流式上传处理失败: {response.status_code}")
+            print(f"  错误信息: {response.text}")
+            return None
+    except Exception as e:
+        print(f"✗ 流式上传文档时发生错误: {str(e)}")
+        return None
+
+def wait_for_task(status_url, timeout=TASK_POLL_TIMEOUT):
+    """轮询异步任务状态，直到任务完成或失败；超时返回None"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = SESSION.get(f"{BASE_URL}{status_url}")
+        if response.status_code != 200:
+            print(f"✗ 查询任务状态失败: {response.status_code}")
+            return None
+        status = response_json(response)
+        if status['status'] in ('completed', 'failed'):
+            return status
+        time.sleep(TASK_POLL_INTERVAL)
+    print("✗ 等待异步任务超时")
+    return None
+
+def test_async_cached_document(file_path):
+    """
+    测试已处理过的文档再次异步提交：复用缓存结果时仍应返回202和status_url，
+    且状态查询直接返回completed
+    """
+    print(f"\n=== 测试异步处理（复用缓存）: {file_path.name} ===")
+    
+    try:
+        for attempt in range(2):
+            with open(file_path, 'rb') as f:
+                files = {'file': (file_path.name, f)}
+                response = SESSION.post(f"{BASE_URL}/api/v1/process-document", files=files, data={'async': 'true'})
+            
+            if response.status_code != 202:
+                print(f"✗ 异步请求未返回202: {response.status_code}")
+                print(f"  错误信息: {response.text}")
+                return None
+            result = response_json(response)
+            if 'status_url' not in result:
+                print("✗ 异步响应中缺少status_url")
+                return None
+            
+            status = wait_for_task(result['status_url'])
+            if status is None or status['status'] != 'completed':
+                print(f"✗ 异步任务未完成: {status}")
+                return None
+        
+        # 第一次提交后结果已登记到缓存，第二次提交应直接完成
+        if result['status'] != 'completed':
+            print(f"✗ 复用缓存的异步请求状态应为completed: {result['status']}")
+            return None
+        print("✓ 复用缓存的异步请求返回202，状态为completed")
+        print(f"  任务ID: {result['task_id']}")
+        print(f"  结果文件: {status['result_files']}")
+        return status
+    except Exception as e:
+        print(f"✗ 异步处理文档时发生错误: {str(e)}")
+        return None
+
 def test_batch_documents(file_paths):
     """测试批量文档处理"""
     print(f"\n=== 测试批量文档处理 ({len(file_paths)}个文件) ===")
     
     try:
-        # 准备文件列表
-        files = []
-        for file_path in file_paths:
-            files.append(('files', (file_path.name, open(file_path, 'rb'))))
-        
-        print(f"正在批量处理 {len(file_paths)} 个文件...")
-        response = requests.post(f"{BASE_URL}/api/v1/batch-process", files=files)
-        
-        # 关闭所有文件
-        for _, (_, file_obj) in files:
-            file_obj.close()
+        # 准备文件列表，ExitStack保证请求结束或出错时关闭所有文件
+        with ExitStack() as stack:
+            files = [
+                ('files', (file_path.name, stack.enter_context(open(file_path, 'rb'))))
+                for file_path in file_paths
+            ]
+            
+            print(f"正在批量处理 {len(file_paths)} 个文件...")
+            response = SESSION.post(f"{BASE_URL}/api/v1/batch-process", files=files)
         
         if response.status_code == 200:
-            result = response.json()
+            result = response_json(response)
             print("✓ 批量文档处理成功")
             print(f"  批量任务ID: {result['task_id']}")
             print(f"  结果文件数量: {len(result['result_files'])}")
@@ -105,18 +236,9 @@ def test_batch_documents(file_paths):
         else:
             print(f"✗ 批量文档处理失败: {response.status_code}")
             print(f"  错误信息: {response.text}")
-            # 确保文件被关闭
-            for _, (_, file_obj) in files:
-                file_obj.close()
             return None
     except Exception as e:
         print(f"✗ 批量处理文档时发生错误: {str(e)}")
-        # 确保文件被关闭
-        for _, (_, file_obj) in files:
-            try:
-                file_obj.close()
-            except:
-                pass
         return None
 
 def download_result(task_id, filename, save_path):
@@ -125,26 +247,29 @@ def download_result(task_id, filename, save_path):
     
     try:
         # URL编码文件名（处理路径分隔符和中文字符）
-        encoded_filename = quote(filename, safe='')
+        encoded_filename = quote_filename(filename)
         download_url = f"{BASE_URL}/api/v1/download/{task_id}/{encoded_filename}"
         
         print(f"正在下载结果文件: {filename}")
         print(f"下载URL: {download_url}")
-        response = requests.get(download_url)
-        
-        if response.status_code == 200:
-            # 确保保存目录存在
-            save_path = Path(save_path)
-            save_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(save_path, 'wb') as f:
-                f.write(response.content)
-            print(f"✓ 结果文件已保存为: {save_path}")
-            return str(save_path)
-        else:
-            print(f"✗ 下载失败: {response.status_code}")
-            print(f"  错误信息: {response.text}")
-            return None
+        # 流式下载，分块写入文件，不在内存中保存完整的响应内容
+        with SESSION.get(download_url, stream=True) as response:
+            if response.status_code == 200:
+                # 确保保存目录存在
+                save_path = Path(save_path)
+                save_path.parent.mkdir(parents=True, exist_ok=True)
+                
+                # 直接从底层响应流复制到文件，由copyfileobj在一个循环中完成读写；
+                # decode_content保证服务端启用压缩时写入的是解压后的内容
+                response.raw.decode_content = True
+                with open(save_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, DOWNLOAD_CHUNK_SIZE)
+                print(f"✓ 结果文件已保存为: {save_path}")
+                return str(save_path)
+            else:
+                print(f"✗ 下载失败: {response.status_code}")
+                print(f"  错误信息: {response.text}")
+                return None
     except Exception as e:
         print(f"✗ 下载结果时发生错误: {str(e)}")
         return None
@@ -154,17 +279,23 @@ def show_result_preview(filename):
     print(f"\n=== 结果文件内容预览: {filename} ===")
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            content = f.read()
-            # 只显示前1000个字符
-            preview = content[:1000] + "..." if len(content) > 1000 else content
-            print(preview)
-            
-            if len(content) > 1000:
-                print(f"\n... (文件内容已截断，完整内容请查看 {filename})")
+        # 只读取文件开头：UTF-8每个字符最多4字节，读取 PREVIEW_LENGTH*4 字节足以得到前 PREVIEW_LENGTH 个字符
+        file_size = os.path.getsize(filename)
+        with open(filename, 'rb') as f:
+            data = f.read(PREVIEW_LENGTH * 4)
+        # 未读到文件末尾时，末尾可能是不完整的多字节字符，交给增量解码器丢弃
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        content = decoder.decode(data, final=len(data) == file_size)
+        truncated = len(data) < file_size or len(content) > PREVIEW_LENGTH
+        
+        # 只显示前1000个字符
+        preview = content[:PREVIEW_LENGTH] + "..." if truncated else content
+        print(preview)
+        
+        if truncated:
+            print(f"\n... (文件内容已截断，完整内容请查看 {filename})")
                 
         # 显示文件大小
-        file_size = os.path.getsize(filename)
         print(f"\n文件大小: {file_size} 字节")
     except Exception as e:
         print(f"✗ 读取结果文件时发生错误: {str(e)}")
@@ -207,11 +338,17 @@ def main():
             # 5. 显示结果预览
             show_result_preview(downloaded_file)
     
-    # 6. 测试批量文档处理
+    # 6. 测试流式上传处理
+    test_stream_upload(test_files[0])
+    
+    # 7. 测试已处理文档的异步提交（复用缓存）
+    test_async_cached_document(test_files[0])
+    
+    # 8. 测试批量文档处理
     batch_result = test_batch_documents(test_files)
     
     if batch_result:
-        # 7. 下载批量处理结果
+        # 9. 下载批量处理结果
         print(f"\n=== 下载批量处理结果 ===")
         batch_dir = Path("test_results/integration_batch_results")
         batch_dir.mkdir(parents=True, exist_ok=True)
@@ -5,9 +5,143 @@
 
 import os
 import re
+import copy
+import mmap
 import json
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import zip_longest
+from typing import Iterator, List, Optional, Tuple
 import argparse
+from types import MappingProxyType
+
+# 可选：使用orjson解析配置文件、序列化分块索引条目
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 可选：使用re2（线性时间匹配，无回溯）处理base64图片这类可能很长的扫描
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
+
+# 当前脚本所在目录，模块加载时计算一次
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 标题识别模式
+TITLE_PATTERNS = [
+    r'^#{1,6}\s.*$',           # Markdown标题
+    r'^\*\*[^\n]+\*\*$',       # 加粗标题
+]
+
+# 与实例配置无关的正则表达式在模块加载时编译一次，所有分割器实例共用
+# 所有标题模式合并为一个分支表达式，一次匹配即可判断
+TITLE_PATTERN = re.compile('|'.join(f'(?:{pattern})' for pattern in TITLE_PATTERNS))
+# 段落分隔（两个换行符，中间可以有空白）
+PARAGRAPH_PATTERN = re.compile(r'\n\s*\n')
+# base64图片（使用模糊匹配，支持多行）
+# 图片段落可能非常长，且多个.*?在无闭合括号时会反复回溯，re2可用时改用re2匹配；
+# 模式中不含re2不支持的语法，DOTALL以内联标记(?s)给出，两种引擎匹配结果相同
+IMAGE_REGEX_ENGINE = re2 if RE2_AVAILABLE else re
+BASE64_IMAGE_PATTERN = IMAGE_REGEX_ENGINE.compile(r'(?s)!\[.*?\]\(data:image/.*?;base64.*?\)')
+BASE64_IMAGE_BLOCK_PATTERN = IMAGE_REGEX_ENGINE.compile(r'(?s)^!\[.*?\]\(data:image/.*?;base64.*?\)$')
+# 列表项开头的符号
+LIST_ITEM_BULLETS = ('*', '-', '+')
+# 中英文句子结束标点
+SENTENCE_SPLIT_PATTERN = re.compile(r'([.!?。！？]+)')
+# 中文句子结束位置
+CJK_SENTENCE_PATTERN = re.compile(r'(?<=[。！？])')
+# 删除标题中Markdown标记的转换表
+TITLE_MARKUP_TABLE = str.maketrans('', '', '#*[]')
+# 可能导致文件名问题的字符
+FILENAME_UNSAFE_PATTERN = re.compile(r'[<>:"/\\|?*\x00-\x1f]|data:image/[a-z]+;base64[^\s]*|\![\(][^\)]*[\)]')
+# 标题判断结果缓存的条目数
+TITLE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def is_title_text(text: str) -> bool:
+    """
+    判断去除首尾空白后的文本是否为标题，结果按文本缓存
+    
+    Args:
+        text: 去除首尾空白后的段落内容
+        
+    Returns:
+        是否为标题
+    """
+    return TITLE_PATTERN.match(text) is not None
+
+
+@lru_cache(maxsize=32)
+def compile_semantic_patterns(patterns: Tuple) -> Tuple:
+    """
+    编译文本分割点模式，相同的模式组合只编译一次，供之后创建的分割器实例复用
+    
+    Args:
+        patterns: 模式元组，元素可以是字符串或已编译的正则表达式
+        
+    Returns:
+        编译后的正则表达式元组
+    """
+    return tuple(re.compile(pattern) for pattern in patterns)
+
+
+def dump_index_entry(entry: dict) -> bytes:
+    """
+    将单个分块索引条目序列化为缩进2个空格的UTF-8 JSON
+    
+    Args:
+        entry: 分块索引条目
+        
+    Returns:
+        序列化后的字节串
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(entry, option=orjson.OPT_INDENT_2)
+    return json.dumps(entry, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def is_list_item(text: str) -> bool:
+    """
+    判断文本是否以列表项开头（"* "、"- "、"+ " 或 "1. "），用字符串方法代替正则匹配
+    
+    Args:
+        text: 段落内容
+        
+    Returns:
+        是否以列表项开头
+    """
+    if text[:1] in LIST_ITEM_BULLETS:
+        return text[1:2].isspace()
+    digit_count = 0
+    while digit_count < len(text) and text[digit_count].isdecimal():
+        digit_count += 1
+    return digit_count > 0 and text[digit_count:digit_count + 1] == '.' and text[digit_count + 1:digit_count + 2].isspace()
+
+
+def find_markdown_files(input_dir: str) -> List[Tuple[str, str]]:
+    """
+    递归获取目录中的所有Markdown文件（适应新的目录结构）
+    
+    Args:
+        input_dir: 输入目录
+        
+    Returns:
+        (相对于输入目录的路径, 完整路径) 列表
+    """
+    md_files = []
+    for root, dirs, files in os.walk(input_dir):
+        for file in files:
+            if file.lower().endswith('.md'):
+                full_path = os.path.join(root, file)
+                md_files.append((os.path.relpath(full_path, input_dir), full_path))
+    return md_files
 
 
 class SemanticChunker:
@@ -26,7 +160,7 @@ class SemanticChunker:
             chunk_max_length: 分割块最大字符长度
             overlap_min_length: 重叠文本最小长度
             overlap_max_length: 重叠文本最大长度
-            semantic_patterns: 文本分割点的正则表达式模式列表
+            semantic_patterns: 文本分割点的正则表达式模式列表（字符串或已编译的正则表达式）
             enable_overlap: 是否启用重叠文本功能
             chunking_method: 分块方式 ("semantic", "length", "paragraph")
             chunk_by_length_config: 按长度分块的配置
@@ -48,11 +182,21 @@ class SemanticChunker:
             r'\n\n\*\*[^\n]+\*\*\n', # 加粗的段落标题
             r'\n\n[A-Z][^\n]*\n\n', # 可能的章节标题（大写字母开头的独立段落）
         ]
-        # 标题识别模式
-        self.title_patterns = [
-            r'^#{1,6}\s.*$',           # Markdown标题
-            r'^\*\*[^\n]+\*\*$',       # 加粗标题
-        ]
+        self.title_patterns = list(TITLE_PATTERNS)
+        
+        # 分割点模式随配置变化，按模式组合缓存编译结果；其余正则表达式使用模块级预编译对象
+        self.compiled_semantic_patterns = list(compile_semantic_patterns(tuple(self.semantic_patterns)))
+        self.paragraph_pattern = PARAGRAPH_PATTERN
+        self.base64_image_pattern = BASE64_IMAGE_PATTERN
+        self.base64_image_block_pattern = BASE64_IMAGE_BLOCK_PATTERN
+        self.sentence_split_pattern = SENTENCE_SPLIT_PATTERN
+        self.cjk_sentence_pattern = CJK_SENTENCE_PATTERN
+        self.filename_unsafe_pattern = FILENAME_UNSAFE_PATTERN
+        
+        # 最近一次分块时顺带记录的段落标题和标题标记，保存索引时复用，避免再次扫描原文
+        self.last_chunked_content = None
+        self.last_titles = []
+        self.last_title_flags = []
     
     def read_markdown(self, file_path: str) -> str:
         """
@@ -64,8 +208,17 @@ class SemanticChunker:
         Returns:
             文件内容字符串
         """
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        with open(file_path, 'rb') as f:
+            # 空文件无法映射
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            # 通过内存映射直接解码文件内容，不经过文件缓冲区和中间bytes对象的复制
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                content = str(buf, 'utf-8')
+        # 与文本模式读取保持一致，统一换行符
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
     
     def detect_semantic_breaks(self, content: str) -> List[int]:
         """
@@ -78,19 +231,22 @@ class SemanticChunker:
             分割点位置列表
         """
         breaks = [0]  # 开始位置总是分割点
+        # 用集合判断位置是否已记录，避免在列表中逐个查找
+        seen = {0}
         
         # 查找所有可能的文本分割点
-        for pattern in self.semantic_patterns:
-            for match in re.finditer(pattern, content):
+        for pattern in self.compiled_semantic_patterns:
+            for match in pattern.finditer(content):
                 pos = match.start() + 1  # +1 是为了跳过前面的\n
-                if pos not in breaks:
+                if pos not in seen:
+                    seen.add(pos)
                     breaks.append(pos)
         
         # 添加段落边界作为分割点（两个换行符）
-        paragraph_pattern = r'\n\s*\n'
-        for match in re.finditer(paragraph_pattern, content):
+        for match in self.paragraph_pattern.finditer(content):
             pos = match.end()
-            if pos not in breaks:
+            if pos not in seen:
+                seen.add(pos)
                 breaks.append(pos)
         
         # 添加结束位置
@@ -117,6 +273,44 @@ class SemanticChunker:
         else:  # 默认使用语义分块
             return self.chunk_by_semantic(content)
     
+    def _start_title_record(self, content: str):
+        """
+        开始一次新的分块，清空上一次记录的段落标题
+        
+        Args:
+            content: 本次分块的文本内容
+        """
+        self.last_chunked_content = content
+        self.last_titles = []
+        self.last_title_flags = []
+    
+    def _record_paragraph_title(self, cleaned_paragraph: str, is_title: bool):
+        """
+        记录分块过程中遇到的段落标题和标题标记
+        
+        Args:
+            cleaned_paragraph: 去除首尾空白后的段落
+            is_title: 段落是否为标题
+        """
+        self.last_title_flags.append(is_title)
+        self.last_titles.append(self._paragraph_title(cleaned_paragraph, is_title))
+    
+    def _iter_paragraphs(self, content: str) -> Iterator[str]:
+        """
+        按段落分隔符逐个产出段落，结果与paragraph_pattern.split相同，但不生成中间列表
+        
+        Args:
+            content: 待分割的文本内容
+            
+        Yields:
+            段落文本（未去除首尾空白）
+        """
+        prev_end = 0
+        for match in self.paragraph_pattern.finditer(content):
+            yield content[prev_end:match.start()]
+            prev_end = match.end()
+        yield content[prev_end:]
+    
     def chunk_by_length(self, content: str) -> List[str]:
         """
         按固定长度进行文本分割，同时正确处理标题
@@ -129,13 +323,12 @@ class SemanticChunker:
         """
         chunk_size = self.chunk_by_length_config.get("chunk_size", 100)
         chunk_overlap = self.chunk_by_length_config.get("chunk_overlap", 20)
-        
-        # 首先按段落分割内容
-        paragraphs = re.split(r'\n\s*\n', content)
+        self._start_title_record(content)
         
         chunks = []
         
-        for paragraph in paragraphs:
+        # 首先按段落分割内容
+        for paragraph in self._iter_paragraphs(content):
             if not paragraph.strip():
                 continue
                 
@@ -143,6 +336,7 @@ class SemanticChunker:
             
             # 检查当前段落是否为标题
             is_title = self._is_title_paragraph(cleaned_paragraph)
+            self._record_paragraph_title(cleaned_paragraph, is_title)
             
             if is_title:
                 # 标题作为独立的空块处理
@@ -176,13 +370,12 @@ class SemanticChunker:
             分割后的文本块列表
         """
         max_chunk_size = self.chunk_by_paragraph_config.get("max_chunk_size", 500)
-        
-        # 按段落分割内容（两个换行符）
-        paragraphs = re.split(r'\n\s*\n', content)
+        self._start_title_record(content)
         
         chunks = []
         
-        for paragraph in paragraphs:
+        # 按段落分割内容（两个换行符）
+        for paragraph in self._iter_paragraphs(content):
             if not paragraph.strip():
                 continue
             
@@ -190,6 +383,7 @@ class SemanticChunker:
             
             # 检查当前段落是否为标题
             is_title = self._is_title_paragraph(cleaned_paragraph)
+            self._record_paragraph_title(cleaned_paragraph, is_title)
             
             # 如果是标题，则单独作为一个块处理（但内容为空）
             if is_title:
@@ -201,23 +395,24 @@ class SemanticChunker:
             if len(cleaned_paragraph) > max_chunk_size:
                 # 按句子分割段落
                 sentences = self._split_into_sentences(cleaned_paragraph)
-                current_chunk = ""
+                # 当前块的各部分及总长度，输出时再拼接，避免反复拼接字符串
+                current_parts = []
+                current_len = 0
                 
                 for sentence in sentences:
                     # 如果加上当前句子会超过最大块大小，且当前块已有内容，则保存当前块
-                    if current_chunk and len(current_chunk) + len(sentence) > max_chunk_size:
-                        chunks.append(current_chunk.strip())
-                        current_chunk = sentence
+                    if current_parts and current_len + len(sentence) > max_chunk_size:
+                        chunks.append("".join(current_parts).strip())
+                        current_parts = [sentence]
+                        current_len = len(sentence)
                     else:
                         # 合并到当前块
-                        if current_chunk:
-                            current_chunk += sentence
-                        else:
-                            current_chunk = sentence
+                        current_parts.append(sentence)
+                        current_len += len(sentence)
                 
                 # 保存最后一个块
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
+                if current_parts:
+                    chunks.append("".join(current_parts).strip())
             else:
                 # 每个段落作为一个独立的块
                 chunks.append(cleaned_paragraph)
@@ -234,88 +429,84 @@ class SemanticChunker:
         Returns:
             分割后的文本块列表
         """
-        # 按段落分割内容（两个换行符）
-        paragraphs = re.split(r'\n\s*\n', content)
-        
+        self._start_title_record(content)
         chunks = []
-        current_chunk = ""
+        # 当前块的各部分及总长度，保存时再拼接，避免反复拼接字符串
+        current_parts = []
+        current_len = 0
         
-        # 按段落进行分组，优先保持段落完整性
-        i = 0
-        while i < len(paragraphs):
-            paragraph = paragraphs[i]
+        # 按段落（两个换行符）进行分组，优先保持段落完整性
+        for paragraph in self._iter_paragraphs(content):
             if not paragraph.strip():
-                i += 1
                 continue
                 
             cleaned_paragraph = paragraph.strip()
             
-            # 检查当前段落是否包含base64图片（使用模糊匹配）
+            # 检查当前段落是否为标题（图片段落也要记录，保存索引时按段落顺序取标题）
+            is_title = self._is_title_paragraph(cleaned_paragraph)
+            self._record_paragraph_title(cleaned_paragraph, is_title)
+            
+            # 检查当前段落是否包含base64图片（使用模糊匹配），同时按图片切分段落
             # 使用更宽松的正则表达式来匹配图片，支持多行匹配
-            base64_images = re.findall(r'!\[.*?\]\(data:image/.*?;base64.*?\)', cleaned_paragraph, re.DOTALL)
-            if base64_images:
+            segments = self._split_base64_images(cleaned_paragraph)
+            if segments:
                 # 如果当前块不为空，先保存当前块
-                if current_chunk and current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                    current_chunk = ""
+                current_text = "".join(current_parts).strip()
+                if current_text:
+                    self._append_bounded_chunk(chunks, current_text)
+                    current_parts = []
+                    current_len = 0
                 
                 # 特殊处理：将包含图片的段落按图片分割成独立的块
-                # 使用正则表达式分割，保留分隔符
-                parts = re.split(r'(!\[.*?\]\(data:image/.*?;base64.*?\))', cleaned_paragraph, flags=re.DOTALL)
-                
-                # 处理分割后的部分
-                for part in parts:
-                    if part.strip():
-                        # 检查是否为图片（使用模糊匹配）
-                        if re.match(r'!\[.*?\]\(data:image/.*?;base64.*?\)', part.strip(), re.DOTALL):
-                            # 这是一个base64图片，单独作为一个块
-                            chunks.append(part.strip())
-                        else:
-                            # 这是普通文本部分，需要进一步处理
-                            # 如果文本部分不为空，按正常逻辑处理
-                            if part.strip():
-                                text_chunks = self._process_text_content(part.strip())
-                                chunks.extend(text_chunks)
+                for is_image, part in segments:
+                    if is_image:
+                        # 这是一个base64图片，单独作为一个块
+                        self._append_bounded_chunk(chunks, part)
+                    elif part.strip():
+                        # 这是普通文本部分，按正常逻辑处理
+                        for text_chunk in self._process_text_content(part.strip()):
+                            self._append_bounded_chunk(chunks, text_chunk)
                 
-                i += 1
                 continue
             
-            # 检查当前段落是否为标题
-            is_title = self._is_title_paragraph(cleaned_paragraph)
-            
             # 如果是标题，则单独作为一个块处理（但内容为空）
             if is_title:
                 # 如果当前块不为空，先保存当前块
-                if current_chunk and current_chunk.strip():
-                    chunks.append(current_chunk.strip())
-                    current_chunk = ""
+                current_text = "".join(current_parts).strip()
+                if current_text:
+                    self._append_bounded_chunk(chunks, current_text)
+                    current_parts = []
+                    current_len = 0
                 # 标题单独作为一个块，但内容为空（只在索引中保留标题）
-                chunks.append("")
-                i += 1
+                self._append_bounded_chunk(chunks, "")
                 continue
             
             # 检查当前段落是否以列表项开始
-            is_list_item = bool(re.match(r'^([\*\-\+]\s|\d+\.\s)', cleaned_paragraph))
+            paragraph_is_list_item = is_list_item(cleaned_paragraph)
             
             # 如果当前块加上新段落后超过最大长度
-            if len(current_chunk) + len(cleaned_paragraph) > self.chunk_max_length:
+            if current_len + len(cleaned_paragraph) > self.chunk_max_length:
                 # 如果当前块已达到最小长度，则保存当前块并开始新块
-                if len(current_chunk) >= self.chunk_min_length:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = cleaned_paragraph
+                if current_len >= self.chunk_min_length:
+                    self._append_bounded_chunk(chunks, "".join(current_parts).strip())
+                    current_parts = [cleaned_paragraph]
+                    current_len = len(cleaned_paragraph)
                 else:
                     # 如果当前块未达到最小长度，尝试合并
-                    if current_chunk:
-                        current_chunk += "\n\n" + cleaned_paragraph
-                    else:
-                        current_chunk = cleaned_paragraph
+                    if current_parts:
+                        current_parts.append("\n\n")
+                        current_len += 2
+                    current_parts.append(cleaned_paragraph)
+                    current_len += len(cleaned_paragraph)
                     
                     # 如果合并后超过最大长度，则强制分割
-                    if len(current_chunk) > self.chunk_max_length:
+                    if current_len > self.chunk_max_length:
+                        current_chunk = "".join(current_parts)
+                        current_parts = []
+                        current_len = 0
                         # 如果是列表项，尽量保持完整性
-                        if is_list_item:
-                            chunks.append(current_chunk.strip())
-                            current_chunk = ""
+                        if paragraph_is_list_item:
+                            self._append_bounded_chunk(chunks, current_chunk.strip())
                         else:
                             # 否则按句子分割
                             sentences = self._split_into_sentences(current_chunk)
@@ -323,38 +514,66 @@ class SemanticChunker:
                             for sentence in sentences:
                                 if len(temp_chunk) + len(sentence) > self.chunk_max_length or len(temp_chunk) < self.chunk_min_length:
                                     if temp_chunk:
-                                        chunks.append(temp_chunk.strip())
+                                        self._append_bounded_chunk(chunks, temp_chunk.strip())
                                     temp_chunk = sentence
                             if temp_chunk:
-                                current_chunk = temp_chunk
-                            else:
-                                current_chunk = ""
+                                current_parts = [temp_chunk]
+                                current_len = len(temp_chunk)
             else:
                 # 合并到当前块
-                if current_chunk:
-                    current_chunk += "\n\n" + cleaned_paragraph
-                else:
-                    current_chunk = cleaned_paragraph
-            i += 1
+                if current_parts:
+                    current_parts.append("\n\n")
+                    current_len += 2
+                current_parts.append(cleaned_paragraph)
+                current_len += len(cleaned_paragraph)
         
         # 保存最后一个块
-        if current_chunk and current_chunk.strip():
-            chunks.append(current_chunk.strip())
+        current_text = "".join(current_parts).strip()
+        if current_text:
+            self._append_bounded_chunk(chunks, current_text)
         
-        # 后处理：处理过长的块
-        final_chunks = []
-        for chunk in chunks:
-            if len(chunk) <= self.chunk_max_length:
-                final_chunks.append(chunk)
-            else:
-                # 对于仍然过长的块，按段落进行分割
-                final_chunks.extend(self._split_long_chunk_by_paragraph(chunk))
+        # 处理重叠文本（如果启用）；重叠需要相邻的块，只能在所有块生成后处理
+        if self.enable_overlap and len(chunks) > 1:
+            chunks = self._add_overlap_to_chunks(chunks)
         
-        # 处理重叠文本（如果启用）
-        if self.enable_overlap and len(final_chunks) > 1:
-            final_chunks = self._add_overlap_to_chunks(final_chunks)
+        return chunks
+    
+    def _append_bounded_chunk(self, chunks: List[str], chunk: str):
+        """
+        添加文本块，过长的块在添加时直接按段落分割，无需在分块结束后再遍历一次
         
-        return final_chunks
+        Args:
+            chunks: 文本块列表
+            chunk: 待添加的文本块
+        """
+        if len(chunk) <= self.chunk_max_length:
+            chunks.append(chunk)
+        else:
+            # 对于仍然过长的块，按段落进行分割
+            chunks.extend(self._split_long_chunk_by_paragraph(chunk))
+    
+    def _split_base64_images(self, paragraph: str) -> List[Tuple[bool, str]]:
+        """
+        一次扫描将段落切分为文本和base64图片片段
+        
+        Args:
+            paragraph: 段落文本
+            
+        Returns:
+            (是否为图片, 片段内容) 列表；段落中没有图片时返回空列表
+        """
+        segments = []
+        # 绝大多数段落不含图片，先做子串判断，避免对其运行DOTALL正则
+        if 'data:image/' not in paragraph:
+            return segments
+        last_end = 0
+        for match in self.base64_image_pattern.finditer(paragraph):
+            segments.append((False, paragraph[last_end:match.start()]))
+            segments.append((True, match.group()))
+            last_end = match.end()
+        if segments:
+            segments.append((False, paragraph[last_end:]))
+        return segments
     
     def _process_text_content(self, text_content: str) -> List[str]:
         """
@@ -376,24 +595,24 @@ class SemanticChunker:
         # 如果文本长度超过最大块长度，按句子分割
         sentences = self._split_into_sentences(text_content)
         chunks = []
-        current_chunk = ""
+        current_parts = []
+        current_len = 0
         
         for sentence in sentences:
             if not sentence.strip():
                 continue
                 
-            if len(current_chunk) + len(sentence) > self.chunk_max_length and len(current_chunk) >= self.chunk_min_length:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence
+            if current_len + len(sentence) > self.chunk_max_length and current_len >= self.chunk_min_length:
+                if current_parts:
+                    chunks.append("".join(current_parts).strip())
+                current_parts = [sentence]
+                current_len = len(sentence)
             else:
-                if current_chunk:
-                    current_chunk += sentence
-                else:
-                    current_chunk = sentence
+                current_parts.append(sentence)
+                current_len += len(sentence)
         
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if current_parts:
+            chunks.append("".join(current_parts).strip())
             
         return chunks if chunks else [text_content]
     
@@ -477,29 +696,31 @@ class SemanticChunker:
             分割后的文本块列表
         """
         # 按段落分割（两个换行符）
-        paragraphs = re.split(r'\n\s*\n', chunk)
         chunks = []
-        current_chunk = ""
+        current_parts = []
+        current_len = 0
         
-        for paragraph in paragraphs:
+        for paragraph in self._iter_paragraphs(chunk):
             if not paragraph.strip():
                 continue
                 
             # 清理段落
             cleaned_paragraph = paragraph.strip()
             
-            if len(current_chunk) + len(cleaned_paragraph) > self.chunk_max_length and len(current_chunk) >= self.chunk_min_length:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = cleaned_paragraph
+            if current_len + len(cleaned_paragraph) > self.chunk_max_length and current_len >= self.chunk_min_length:
+                if current_parts:
+                    chunks.append("".join(current_parts).strip())
+                current_parts = [cleaned_paragraph]
+                current_len = len(cleaned_paragraph)
             else:
-                if current_chunk:
-                    current_chunk += "\n\n" + cleaned_paragraph
-                else:
-                    current_chunk = cleaned_paragraph
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+                if current_parts:
+                    current_parts.append("\n\n")
+                    current_len += 2
+                current_parts.append(cleaned_paragraph)
+                current_len += len(cleaned_paragraph)
+        
+        if current_parts:
+            chunks.append("".join(current_parts).strip())
             
         # 如果仍然有超过最大长度的块，使用句子分割
         final_chunks = []
@@ -522,26 +743,26 @@ class SemanticChunker:
             分割后的文本块列表
         """
         # 按句子分割
-        sentences = re.split(r'(?<=[。！？])', chunk)
+        sentences = self.cjk_sentence_pattern.split(chunk)
         chunks = []
-        current_chunk = ""
+        current_parts = []
+        current_len = 0
         
         for sentence in sentences:
             if not sentence.strip():
                 continue
                 
-            if len(current_chunk) + len(sentence) > self.chunk_max_length and len(current_chunk) >= self.chunk_min_length:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence
+            if current_len + len(sentence) > self.chunk_max_length and current_len >= self.chunk_min_length:
+                if current_parts:
+                    chunks.append("".join(current_parts).strip())
+                current_parts = [sentence]
+                current_len = len(sentence)
             else:
-                if current_chunk:
-                    current_chunk += sentence
-                else:
-                    current_chunk = sentence
+                current_parts.append(sentence)
+                current_len += len(sentence)
         
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if current_parts:
+            chunks.append("".join(current_parts).strip())
             
         return chunks if chunks else [chunk]
     
@@ -555,23 +776,18 @@ class SemanticChunker:
         Returns:
             分割后的句子列表
         """
-        # 中英文句子分割的正则表达式
-        sentence_endings = r'[.!?。！？]+'
-        sentences = re.split(f'({sentence_endings})', text)
-        
-        # 合并句子和标点符号
-        combined_sentences = []
-        i = 0
-        while i < len(sentences):
-            if i + 1 < len(sentences) and re.match(sentence_endings, sentences[i + 1]):
-                combined_sentences.append(sentences[i] + sentences[i + 1])
-                i += 2
-            else:
-                if sentences[i].strip():  # 只添加非空句子
-                    combined_sentences.append(sentences[i])
-                i += 1
-        
-        return [s.strip() for s in combined_sentences if s.strip()]
+        # 中英文句子分割（保留标点符号）
+        sentences = self.sentence_split_pattern.split(text)
+        
+        # 合并句子和标点符号：带捕获组的split结果中奇数位置必然是标点，偶数位置是句子文本
+        return [
+            sentence
+            for sentence in (
+                (text_part + ending).strip()
+                for text_part, ending in zip_longest(sentences[::2], sentences[1::2], fillvalue="")
+            )
+            if sentence  # 只保留非空句子
+        ]
     
     def _is_title_paragraph(self, paragraph: str) -> bool:
         """
@@ -583,10 +799,11 @@ class SemanticChunker:
         Returns:
             是否为标题
         """
-        for pattern in self.title_patterns:
-            if re.match(pattern, paragraph.strip()):
-                return True
-        return False
+        text = paragraph.strip()
+        # 标题只能以#或*开头，其余段落无需匹配正则，也不占用缓存
+        if text[:1] not in ('#', '*'):
+            return False
+        return is_title_text(text)
     
     def _extract_title(self, chunk: str) -> str:
         """
@@ -602,20 +819,11 @@ class SemanticChunker:
         if not chunk or not chunk.strip():
             return "文本段落"
             
-        lines = chunk.strip().split('\n')
-        
-        # 如果第一行是标题格式，使用它作为标题
-        if lines and self._is_title_paragraph(lines[0]):
-            title = re.sub(r'[#*\[\]]', '', lines[0]).strip()
-            # 清理标题中的特殊字符
-            title = re.sub(r'[<>:"/\\|?*\x00-\x1f]|data:image/[a-z]+;base64[^\s]*|\![\(][^\)]*[\)]', '', title).strip()
-            return title[:30]  # 限制长度
+        # 只取第一行，无需把整个块按行拆分
+        first_line = chunk.strip().partition('\n')[0]
         
-        # 否则使用前30个字符作为标题
-        first_line = lines[0] if lines else "文本段落"
-        # 移除可能导致文件名问题的字符
-        safe_title = re.sub(r'[<>:"/\\|?*\x00-\x1f]|data:image/[a-z]+;base64[^\s]*|\![\(][^\)]*[\)]', '', first_line).strip()
-        return safe_title[:30] or "文本段落"
+        # 第一行是标题格式时清理其中的标记作为标题，否则使用第一行的前30个字符
+        return self._paragraph_title(first_line, self._is_title_paragraph(first_line))
     
     def process_file(self, input_file: str, output_dir: str = None, save_chunk_index: bool = False, chunk_index_filename: str = "chunk_index.json") -> List[str]:
         """
@@ -670,27 +878,58 @@ class SemanticChunker:
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
         
-        # 清空已存在的分割结果
-        if os.path.exists(output_dir):
-            existing_files = [f for f in os.listdir(output_dir) if os.path.isfile(os.path.join(output_dir, f))]
-            if existing_files:
-                print(f"  清理输出目录，删除 {len(existing_files)} 个已存在的文件")
-                for file in existing_files:
-                    file_path = os.path.join(output_dir, file)
-                    os.remove(file_path)
-        
-        # 用于存储分块索引信息
-        chunk_index = []
+        # 清空已存在的分割结果（只删除文件，保留子目录；scandir自带文件类型，无需逐个stat）
+        with os.scandir(output_dir) as entries:
+            existing_files = [entry.path for entry in entries if entry.is_file()]
+        if existing_files:
+            print(f"  清理输出目录，删除 {len(existing_files)} 个已存在的文件")
+            for file_path in existing_files:
+                os.remove(file_path)
         
-        # 如果有原始内容，预先提取所有标题
+        # 如果有原始内容，预先提取所有标题；原始内容正是刚分块的内容时直接复用分块时记录的结果
         titles = []
         is_title_list = []
         if original_content:
-            titles, is_title_list = self._extract_titles_and_flags_from_content(original_content)
+            if original_content is self.last_chunked_content:
+                titles, is_title_list = self.last_titles, self.last_title_flags
+            else:
+                titles, is_title_list = self._extract_titles_and_flags_from_content(original_content)
         
         # 保存每个文本块到索引文件中，而不是单独的文件
         print(f"  正在保存 {len(chunks)} 个文本块到索引文件...")
         
+        # 保存分块索引文件：逐条序列化写入，不在内存中构建完整的索引列表
+        # 输出格式与json.dump(..., ensure_ascii=False, indent=2)相同
+        if save_chunk_index and chunks:
+            index_filepath = os.path.join(output_dir, chunk_index_filename)
+            try:
+                entry_count = 0
+                with open(index_filepath, 'wb') as f:
+                    f.write(b'[')
+                    for entry in self._iter_chunk_index(chunks, titles, is_title_list):
+                        f.write(b',\n  ' if entry_count else b'\n  ')
+                        # 条目位于列表内，每行再缩进一级；字符串中的换行已被转义，不受影响
+                        f.write(dump_index_entry(entry).replace(b'\n', b'\n  '))
+                        entry_count += 1
+                    f.write(b'\n]')
+                print(f"  ✓ 已保存分块索引文件: {chunk_index_filename} (包含 {entry_count} 个条目)")
+            except Exception as e:
+                print(f"  保存索引文件时出错: {str(e)}")
+        elif save_chunk_index:
+            print("  ⚠️ 未生成索引信息，跳过索引文件保存")
+    
+    def _iter_chunk_index(self, chunks: List[str], titles: List[str], is_title_list: List[bool]) -> Iterator[dict]:
+        """
+        逐个生成分块索引条目
+        
+        Args:
+            chunks: 文本块列表
+            titles: 按段落顺序提取的标题列表
+            is_title_list: 按段落顺序的标题标记列表
+            
+        Yields:
+            分块索引条目
+        """
         # 图片ID计数器，从1开始
         image_id_counter = 1
         
@@ -700,58 +939,41 @@ class SemanticChunker:
             else:
                 title = self._extract_title(chunk)
             
-            # 生成文件名（仅用于标识）
-            filename = f"{i:03d}_{title}.md"
+            # 确定是否为标题块
+            is_title_block = i <= len(is_title_list) and is_title_list[i-1]
             
-            # 记录索引信息，直接包含文本内容
-            if save_chunk_index:
-                # 确定是否为标题块
-                is_title_block = i <= len(is_title_list) and is_title_list[i-1]
-                
-                # 对于标题块，我们存储标题信息
-                index_title = title if is_title_block else ""
-                
-                # 对于空内容的块，添加特殊标记
-                content = chunk if chunk.strip() else ""
-                
-                # 检查是否为图片块（使用模糊匹配）
-                is_image_block = False
-                image_content = ""
-                
-                # 检查整个块是否就是一张图片
-                if re.match(r'^!\[.*?\]\(data:image/.*?;base64.*?\)$', chunk.strip(), re.DOTALL):
-                    is_image_block = True
-                    image_content = chunk.strip()
-                
-                # 准备索引条目
-                index_entry = {
-                    "id": len(chunk_index) + 1,
-                    "title": index_title,
-                    "content": image_content if is_image_block else content,  # 图片块存储图片内容，其他块存储文本内容
-                    "is_title": is_title_block  # 添加标题标记字段
-                }
-                
-                # 如果是图片块，添加image_id属性和type属性
-                if is_image_block:
-                    index_entry["image_id"] = image_id_counter
-                    index_entry["type"] = "image"
-                    image_id_counter += 1
-                else:
-                    index_entry["type"] = "text"
-                
-                chunk_index.append(index_entry)
-        
-        # 保存分块索引文件
-        if save_chunk_index and chunk_index:
-            index_filepath = os.path.join(output_dir, chunk_index_filename)
-            try:
-                with open(index_filepath, 'w', encoding='utf-8') as f:
-                    json.dump(chunk_index, f, ensure_ascii=False, indent=2)
-                print(f"  ✓ 已保存分块索引文件: {chunk_index_filename} (包含 {len(chunk_index)} 个条目)")
-            except Exception as e:
-                print(f"  保存索引文件时出错: {str(e)}")
-        elif save_chunk_index:
-            print("  ⚠️ 未生成索引信息，跳过索引文件保存")
+            # 对于标题块，我们存储标题信息
+            index_title = title if is_title_block else ""
+            
+            # 对于空内容的块，添加特殊标记
+            content = chunk if chunk.strip() else ""
+            
+            # 检查是否为图片块（使用模糊匹配）
+            is_image_block = False
+            image_content = ""
+            
+            # 检查整个块是否就是一张图片
+            if self.base64_image_block_pattern.match(chunk.strip()):
+                is_image_block = True
+                image_content = chunk.strip()
+            
+            # 准备索引条目
+            index_entry = {
+                "id": i,
+                "title": index_title,
+                "content": image_content if is_image_block else content,  # 图片块存储图片内容，其他块存储文本内容
+                "is_title": is_title_block  # 添加标题标记字段
+            }
+            
+            # 如果是图片块，添加image_id属性和type属性
+            if is_image_block:
+                index_entry["image_id"] = image_id_counter
+                index_entry["type"] = "image"
+                image_id_counter += 1
+            else:
+                index_entry["type"] = "text"
+            
+            yield index_entry
     
     def _extract_titles_and_flags_from_content(self, content: str) -> Tuple[List[str], List[bool]]:
         """
@@ -766,9 +988,7 @@ class SemanticChunker:
         titles = []
         is_title_list = []
         # 按段落分割内容
-        paragraphs = re.split(r'\n\s*\n', content)
-        
-        for paragraph in paragraphs:
+        for paragraph in self._iter_paragraphs(content):
             if not paragraph.strip():
                 continue
                 
@@ -777,45 +997,73 @@ class SemanticChunker:
             # 检查当前段落是否为标题
             is_title = self._is_title_paragraph(cleaned_paragraph)
             is_title_list.append(is_title)
-            
-            if is_title:
-                # 提取标题文本（去除Markdown标记）
-                title = re.sub(r'[#*\[\]]', '', cleaned_paragraph).strip()
-                # 清理标题中的特殊字符
-                title = re.sub(r'[<>:"/\\|?*\x00-\x1f]|data:image/[a-z]+;base64[^\s]*|\![\(][^\)]*[\)]', '', title).strip()
-                titles.append(title[:30])  # 限制长度
-            else:
-                # 对于非标题段落，使用前30个字符作为文件名
-                first_line = cleaned_paragraph.split('\n')[0] if '\n' in cleaned_paragraph else cleaned_paragraph
-                # 移除可能导致文件名问题的字符
-                safe_title = re.sub(r'[<>:"/\\|?*\x00-\x1f]|data:image/[a-z]+;base64[^\s]*|\![\(][^\)]*[\)]', '', first_line).strip()
-                titles.append(safe_title[:30] or "文本段落")
+            titles.append(self._paragraph_title(cleaned_paragraph, is_title))
         
         return titles, is_title_list
     
-    def process_directory(self, input_dir: str, output_dir: str, save_chunk_index: bool = False, chunk_index_filename: str = "chunk_index.json"):
+    def _paragraph_title(self, cleaned_paragraph: str, is_title: bool) -> str:
+        """
+        生成段落在索引中使用的标题
+        
+        Args:
+            cleaned_paragraph: 去除首尾空白后的段落
+            is_title: 段落是否为标题
+            
+        Returns:
+            段落标题
+        """
+        if is_title:
+            # 提取标题文本（去除Markdown标记）
+            title = cleaned_paragraph.translate(TITLE_MARKUP_TABLE).strip()
+            # 清理标题中的特殊字符
+            title = self.filename_unsafe_pattern.sub('', title).strip()
+            return title[:30]  # 限制长度
+        # 对于非标题段落，使用前30个字符作为文件名
+        first_line = cleaned_paragraph.partition('\n')[0]
+        # 移除可能导致文件名问题的字符
+        safe_title = self.filename_unsafe_pattern.sub('', first_line).strip()
+        return safe_title[:30] or "文本段落"
+    
+    def _chunker_config(self) -> dict:
+        """
+        获取创建相同分割器所需的参数
+        
+        Returns:
+            SemanticChunker的构造参数
+        """
+        return {
+            "chunk_min_length": self.chunk_min_length,
+            "chunk_max_length": self.chunk_max_length,
+            "overlap_min_length": self.overlap_min_length,
+            "overlap_max_length": self.overlap_max_length,
+            "semantic_patterns": self.semantic_patterns,
+            "enable_overlap": self.enable_overlap,
+            "chunking_method": self.chunking_method,
+            "chunk_by_length_config": self.chunk_by_length_config,
+            "chunk_by_paragraph_config": self.chunk_by_paragraph_config
+        }
+    
+    def process_directory(self, input_dir: str, output_dir: str, save_chunk_index: bool = False, chunk_index_filename: str = "chunk_index.json", max_workers: Optional[int] = None, md_files: Optional[List[Tuple[str, str]]] = None):
         """
         处理目录中的所有Markdown文件
         
+        各文件的分块相互独立，且以CPU计算为主，使用进程池并行处理
+        
         Args:
             input_dir: 输入目录
             output_dir: 输出目录
             save_chunk_index: 是否保存分块索引
             chunk_index_filename: 分块索引文件名
+            max_workers: 并行处理的进程数（默认: CPU核心数）
+            md_files: 已获取的 (相对路径, 完整路径) 列表（默认: 递归扫描输入目录）
         """
         if not os.path.exists(input_dir):
             print(f"❌ 错误: 输入目录 '{input_dir}' 不存在")
             return
         
-        # 递归获取所有Markdown文件（适应新的目录结构）
-        md_files = []
-        for root, dirs, files in os.walk(input_dir):
-            for file in files:
-                if file.lower().endswith('.md'):
-                    # 构建相对于输入目录的路径
-                    full_path = os.path.join(root, file)
-                    relative_path = os.path.relpath(full_path, input_dir)
-                    md_files.append((relative_path, full_path))
+        # 调用方已扫描过目录时直接复用文件列表
+        if md_files is None:
+            md_files = find_markdown_files(input_dir)
         
         if not md_files:
             print(f"⚠️  提示: 在目录 '{input_dir}' 中未找到Markdown文件")
@@ -827,15 +1075,33 @@ class SemanticChunker:
         success_count = 0
         failed_count = 0
         
-        # 处理每个文件
-        for i, (relative_path, full_path) in enumerate(md_files, 1):
-            print(f"[{i}/{len(md_files)}] 处理文件: {relative_path}")
-            try:
-                self.process_file(full_path, output_dir, save_chunk_index, chunk_index_filename)
-                success_count += 1
-            except Exception as e:
-                print(f"  ❌ 处理文件 '{relative_path}' 时出错: {str(e)}")
-                failed_count += 1
+        # 只有一个文件时直接处理，避免创建进程池的开销
+        if len(md_files) == 1 or max_workers == 1:
+            for i, (relative_path, full_path) in enumerate(md_files, 1):
+                print(f"[{i}/{len(md_files)}] 处理文件: {relative_path}")
+                try:
+                    self.process_file(full_path, output_dir, save_chunk_index, chunk_index_filename)
+                    success_count += 1
+                except Exception as e:
+                    print(f"  ❌ 处理文件 '{relative_path}' 时出错: {str(e)}")
+                    failed_count += 1
+        else:
+            # 只把分割参数传给子进程，由子进程各自创建分割器，不序列化整个实例及其缓存状态
+            chunker_config = self._chunker_config()
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = {
+                    pool.submit(process_file_worker, full_path, output_dir, save_chunk_index, chunk_index_filename, chunker_config): relative_path
+                    for relative_path, full_path in md_files
+                }
+                for i, future in enumerate(as_completed(futures), 1):
+                    relative_path = futures[future]
+                    try:
+                        future.result()
+                        print(f"[{i}/{len(md_files)}] 已处理文件: {relative_path}")
+                        success_count += 1
+                    except Exception as e:
+                        print(f"  ❌ 处理文件 '{relative_path}' 时出错: {str(e)}")
+                        failed_count += 1
         
         print("-" * 50)
         print(f"📊 批量处理完成统计:")
@@ -844,9 +1110,27 @@ class SemanticChunker:
             print(f"  ❌ 处理失败: {failed_count} 个文件")
         print(f"  📦 输出目录: {output_dir}")
 
+def process_file_worker(input_file: str, output_dir: str, save_chunk_index: bool, chunk_index_filename: str, chunker_config: dict) -> int:
+    """
+    进程池中处理单个Markdown文件：按传入的参数创建分割器后处理文件
+    
+    Args:
+        input_file: 输入文件路径
+        output_dir: 输出目录
+        save_chunk_index: 是否保存分块索引
+        chunk_index_filename: 分块索引文件名
+        chunker_config: SemanticChunker的构造参数
+        
+    Returns:
+        生成的文本块数量
+    """
+    chunker = SemanticChunker(**chunker_config)
+    return len(chunker.process_file(input_file, output_dir, save_chunk_index, chunk_index_filename))
+
+@lru_cache(maxsize=32)
 def find_config_file(config_file: str, script_dir: str) -> str:
     """
-    动态查找配置文件路径
+    动态查找配置文件路径（同一进程内结果不变，缓存查找结果）
     
     Args:
         config_file: 配置文件名
@@ -869,6 +1153,48 @@ def find_config_file(config_file: str, script_dir: str) -> str:
     
     return config_file  # 返回原始路径，让系统决定
 
+# 配置文件不存在或无法解析时使用的默认参数（只读；嵌套的模式列表使用元组，浅拷贝即可安全修改）
+DEFAULT_CHUNK_CONFIG = MappingProxyType({
+    "chunk_min_length": 50,
+    "chunk_max_length": 200,
+    "overlap_min_length": 10,
+    "overlap_max_length": 50,
+    "semantic_patterns": (
+        "\\n#{1,6} ",           
+        "\\n###+",              
+        "\\n\\n\\*\\*[^\\n]+\\*\\*\\n", 
+        "\\n\\n[A-Z][^\\n]*\\n\\n" 
+    ),
+    "enable_overlap": True,
+    "save_chunk_index": True,
+    "chunk_index_filename": "chunk_index.json"
+})
+
+
+@lru_cache(maxsize=8)
+def read_config_file(config_path: str, mtime_ns: int):
+    """
+    读取并解析配置文件，同一路径和修改时间只解析一次，文件修改后自动重新读取
+    
+    Args:
+        config_path: 配置文件的绝对路径
+        mtime_ns: 配置文件的修改时间（纳秒），作为缓存键的一部分
+        
+    Returns:
+        配置字典，解析失败时返回None
+    """
+    try:
+        # 以字节读取，orjson可直接解析UTF-8字节，无需先解码为str
+        with open(config_path, 'rb') as f:
+            data = f.read()
+        if ORJSON_AVAILABLE:
+            return orjson.loads(data)
+        return json.loads(data.decode('utf-8'))
+    except Exception as e:
+        print(f"读取配置文件时出错: {str(e)}，使用默认参数")
+    return None
+
+
 def load_config(config_file: str = "chunk_config.json") -> dict:
     """
     从配置文件加载分块参数
@@ -879,154 +1205,131 @@ def load_config(config_file: str = "chunk_config.json") -> dict:
     Returns:
         包含分块参数的字典
     """
-        # 获取当前脚本的目录
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
     # 动态查找配置文件
-    config_path = find_config_file(config_file, script_dir)
+    config_path = os.path.abspath(find_config_file(config_file, SCRIPT_DIR))
     
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-            return config
-        except Exception as e:
-            print(f"读取配置文件时出错: {str(e)}，使用默认参数")
+    # 只stat一次，同时判断文件是否存在并取得修改时间
+    try:
+        mtime_ns = os.stat(config_path).st_mtime_ns
+    except OSError:
+        mtime_ns = None
     
-    # 默认参数
-    return {
-        "chunk_min_length": 50,
-        "chunk_max_length": 200,
-        "overlap_min_length": 10,
-        "overlap_max_length": 50,
-        "semantic_patterns": [
-            "\\n#{1,6} ",           
-            "\\n###+",              
-            "\\n\\n\\*\\*[^\\n]+\\*\\*\\n", 
-            "\\n\\n[A-Z][^\\n]*\\n\\n" 
-        ],
-        "enable_overlap": True,
-        "save_chunk_index": True,
-        "chunk_index_filename": "chunk_index.json"
-    }
+    config = read_config_file(config_path, mtime_ns) if mtime_ns is not None else None
+    if config is None:
+        # 默认参数中没有可变的嵌套对象，浅拷贝即可
+        return dict(DEFAULT_CHUNK_CONFIG)
+    # 返回深拷贝，调用方修改（包括嵌套的列表和字典）时不影响缓存
+    return copy.deepcopy(config)
 
 
 def main():
     print("🔤 基于语义分析的文本分割工具")
     print("=" * 40)
     
-    # 获取当前脚本的目录
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # 尝试从配置文件加载参数
-    config = load_config()
-    print(f"⚙️  已加载配置参数")
-    
-    # 从配置文件获取默认输入输出路径
-    default_input_path = config.get("default_input_path", "md_ConvertResult")
-    default_output_path = config.get("default_output_path", "md_SemanticSliced")
-    
-    # 从配置文件获取分块方式配置
-    chunking_method = config.get("chunking_method", "semantic")
-    chunk_by_length_config = config.get("chunk_by_length", {})
-    chunk_by_paragraph_config = config.get("chunk_by_paragraph", {})
-    
+    # 命令行参数默认为None，表示未指定，此时使用配置文件中的参数
     parser = argparse.ArgumentParser(description='基于文本分析的文本分割工具')
-    parser.add_argument('-i', '--input', default=default_input_path, help=f'输入目录路径或单个文件路径（默认: {default_input_path}）')
-    parser.add_argument('-o', '--output', default=default_output_path, help=f'输出目录路径（默认: {default_output_path}）')
-    parser.add_argument('--min-length', type=int, default=config["chunk_min_length"], help='分割块最小字符长度（默认: 50）')
-    parser.add_argument('--max-length', type=int, default=config["chunk_max_length"], help='分割块最大字符长度（默认: 200）')
-    parser.add_argument('--overlap-min', type=int, default=config.get("overlap_min_length", 10), help='重叠文本最小长度（默认: 10）')
-    parser.add_argument('--overlap-max', type=int, default=config.get("overlap_max_length", 50), help='重叠文本最大长度（默认: 50）')
-    parser.add_argument('--enable-overlap', action='store_true', default=config.get("enable_overlap", True), help='启用重叠文本功能（默认: 启用）')
-    parser.add_argument('--save-index', action='store_true', default=config.get("save_chunk_index", True), help='保存分块索引文件（默认: 保存）')
-    parser.add_argument('--index-filename', default=config.get("chunk_index_filename", "chunk_index.json"), help='分块索引文件名（默认: chunk_index.json）')
-    parser.add_argument('--chunking-method', default=chunking_method, choices=['semantic', 'length', 'paragraph'], help=f'分块方式（默认: {chunking_method}）')
+    parser.add_argument('-i', '--input', dest='default_input_path', help='输入目录路径或单个文件路径（默认: 来自配置文件）')
+    parser.add_argument('-o', '--output', dest='default_output_path', help='输出目录路径（默认: 来自配置文件）')
+    parser.add_argument('--min-length', type=int, dest='chunk_min_length', help='分割块最小字符长度（默认: 50）')
+    parser.add_argument('--max-length', type=int, dest='chunk_max_length', help='分割块最大字符长度（默认: 200）')
+    parser.add_argument('--overlap-min', type=int, dest='overlap_min_length', help='重叠文本最小长度（默认: 10）')
+    parser.add_argument('--overlap-max', type=int, dest='overlap_max_length', help='重叠文本最大长度（默认: 50）')
+    parser.add_argument('--enable-overlap', action='store_true', default=None, dest='enable_overlap', help='启用重叠文本功能（默认: 启用）')
+    parser.add_argument('--save-index', action='store_true', default=None, dest='save_chunk_index', help='保存分块索引文件（默认: 保存）')
+    parser.add_argument('--index-filename', dest='chunk_index_filename', help='分块索引文件名（默认: chunk_index.json）')
+    parser.add_argument('--chunking-method', dest='chunking_method', choices=['semantic', 'length', 'paragraph'], help='分块方式（默认: 来自配置文件，未配置时为semantic）')
     parser.add_argument('--config', help='配置文件路径')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='处理目录时的并行进程数（默认: CPU核心数）')
     
     args = parser.parse_args()
     
-    # 如果指定了配置文件，则从配置文件加载参数
+    # 只加载一次配置：命令行参数 > 配置文件 > 默认参数
     if args.config:
         print(f"📄 使用指定配置文件: {args.config}")
-        config = load_config(args.config)
-        # 如果命令行参数没有指定，则使用配置文件中的参数
-        if args.min_length == 50:  # 默认值
-            args.min_length = config.get("chunk_min_length", 50)
-        if args.max_length == 200:  # 默认值
-            args.max_length = config.get("chunk_max_length", 200)
-        if args.overlap_min == 10:  # 默认值
-            args.overlap_min = config.get("overlap_min_length", 10)
-        if args.overlap_max == 50:  # 默认值
-            args.overlap_max = config.get("overlap_max_length", 50)
-        if not args.enable_overlap:  # 如果未在命令行指定，则使用配置文件
-            args.enable_overlap = config.get("enable_overlap", True)
-        if not args.save_index:  # 如果未在命令行指定，则使用配置文件
-            args.save_index = config.get("save_chunk_index", True)
-        if args.index_filename == "chunk_index.json":  # 默认值
-            args.index_filename = config.get("chunk_index_filename", "chunk_index.json")
-        if args.chunking_method == chunking_method:  # 如果使用默认值
-            args.chunking_method = config.get("chunking_method", "semantic")
+    config = load_config(args.config or "chunk_config.json")
+    print(f"⚙️  已加载配置参数")
+    config.update({key: value for key, value in vars(args).items() if value is not None and key not in ('config', 'workers')})
     
-    # 显示当前使用的参数
-    print(f"📊 当前参数设置:")
-    print(f"   最小块长度: {args.min_length}")
-    print(f"   最大块长度: {args.max_length}")
-    print(f"   重叠文本: {'启用' if args.enable_overlap else '禁用'}")
-    if args.enable_overlap:
-        print(f"   重叠范围: {args.overlap_min}-{args.overlap_max} 字符")
-    print(f"   索引文件: {'保存' if args.save_index else '不保存'}")
-    if args.save_index:
-        print(f"   索引文件名: {args.index_filename}")
-    print(f"   分块方式: {args.chunking_method}")
+    input_arg = config.get("default_input_path", "md_ConvertResult")
+    output_arg = config.get("default_output_path", "md_SemanticSliced")
+    min_length = config.get("chunk_min_length", 50)
+    max_length = config.get("chunk_max_length", 200)
+    overlap_min = config.get("overlap_min_length", 10)
+    overlap_max = config.get("overlap_max_length", 50)
+    enable_overlap = config.get("enable_overlap", True)
+    save_index = config.get("save_chunk_index", True)
+    index_filename = config.get("chunk_index_filename", "chunk_index.json")
+    chunking_method = config.get("chunking_method", "semantic")
     
-    # 创建文本分割器
-    chunker = SemanticChunker(
-        chunk_min_length=args.min_length,
-        chunk_max_length=args.max_length,
-        overlap_min_length=args.overlap_min,
-        overlap_max_length=args.overlap_max,
-        semantic_patterns=config.get("semantic_patterns"),
-        enable_overlap=args.enable_overlap,
-        chunking_method=args.chunking_method,
-        chunk_by_length_config=chunk_by_length_config,
-        chunk_by_paragraph_config=chunk_by_paragraph_config
-    )
+    # 显示当前使用的参数（拼接后一次输出）
+    lines = [
+        "📊 当前参数设置:",
+        f"   最小块长度: {min_length}",
+        f"   最大块长度: {max_length}",
+        f"   重叠文本: {'启用' if enable_overlap else '禁用'}",
+    ]
+    if enable_overlap:
+        lines.append(f"   重叠范围: {overlap_min}-{overlap_max} 字符")
+    lines.append(f"   索引文件: {'保存' if save_index else '不保存'}")
+    if save_index:
+        lines.append(f"   索引文件名: {index_filename}")
+    lines.append(f"   分块方式: {chunking_method}")
+    print("\n".join(lines))
     
-    # 构建完整的输入路径（优先使用相对于脚本的路径）
-    input_path = os.path.join(script_dir, args.input)
+    # 检查是否为单个文件：优先使用相对于脚本的路径，其次是绝对路径或相对于当前工作目录的路径
+    input_file = None
+    if input_arg.lower().endswith('.md'):
+        input_path = os.path.join(SCRIPT_DIR, input_arg)
+        if os.path.isfile(input_path):
+            input_file = input_path
+        elif os.path.isfile(input_arg):
+            input_file = input_arg
     
-    # 检查是否为单个文件
-    if os.path.isfile(input_path) and input_path.lower().endswith('.md'):
-        # 处理单个文件
-        print("📄 检测到单个文件，开始处理...")
-        chunks = chunker.process_file(input_path, args.output, args.save_index, args.index_filename)
-        if chunks:
-            print(f"✅ 处理完成，共生成 {len(chunks)} 个文本块")
+    # 目录不存在或没有Markdown文件时无需创建文本分割器
+    md_files = None
+    if not input_file:
+        print("📁 检测到目录，开始批量处理...")
+        if not os.path.exists(input_arg):
+            print(f"❌ 错误: 输入目录 '{input_arg}' 不存在")
         else:
-            print("❌ 文件处理失败")
-    elif os.path.isfile(args.input) and args.input.lower().endswith('.md'):
-        # 如果提供了绝对路径或相对路径的文件
+            md_files = find_markdown_files(input_arg)
+            if not md_files:
+                print(f"⚠️  提示: 在目录 '{input_arg}' 中未找到Markdown文件")
+    
+    if input_file or md_files:
+        # 创建文本分割器
+        chunker = SemanticChunker(
+            chunk_min_length=min_length,
+            chunk_max_length=max_length,
+            overlap_min_length=overlap_min,
+            overlap_max_length=overlap_max,
+            semantic_patterns=config.get("semantic_patterns"),
+            enable_overlap=enable_overlap,
+            chunking_method=chunking_method,
+            chunk_by_length_config=config.get("chunk_by_length", {}),
+            chunk_by_paragraph_config=config.get("chunk_by_paragraph", {})
+        )
+    
+    if input_file:
+        # 处理单个文件
         print("📄 检测到单个文件，开始处理...")
-        chunks = chunker.process_file(args.input, args.output, args.save_index, args.index_filename)
+        chunks = chunker.process_file(input_file, output_arg, save_index, index_filename)
         if chunks:
             print(f"✅ 处理完成，共生成 {len(chunks)} 个文本块")
         else:
             print("❌ 文件处理失败")
-    else:
-        # 处理目录
-        print("📁 检测到目录，开始批量处理...")
-        # 对于输出目录也使用相对于脚本的路径
-        output_path = args.output
+    elif md_files:
+        # 处理目录，对于输出目录也使用相对于脚本的路径
+        output_path = output_arg
         if not os.path.isabs(output_path):
-            output_path = os.path.join(script_dir, output_path)
-        chunker.process_directory(args.input, output_path, args.save_index, args.index_filename)
+            output_path = os.path.join(SCRIPT_DIR, output_path)
+        chunker.process_directory(input_arg, output_path, save_index, index_filename, args.workers, md_files)
 
 
     print("=" * 40)
     print("🎉 文本分割工具执行完毕")
 
-def process_all_documents(input_dir: str, output_dir: str, config_file: str = None):
+def process_all_documents(input_dir: str, output_dir: str, config_file: str = None, max_workers: Optional[int] = None):
     """
     处理目录中的所有文档
     
@@ -1034,9 +1337,10 @@ def process_all_documents(input_dir: str, output_dir: str, config_file: str = No
         input_dir (str): 输入目录路径
         output_dir (str): 输出目录路径
         config_file (str): 配置文件路径
+        max_workers (int): 并行处理的进程数（默认: CPU核心数）
     """
     # 加载配置
-    config = load_chunk_config(config_file) if config_file else {}
+    config = load_config(config_file) if config_file else {}
     
     # 应用配置
     chunk_min_length = config.get("chunk_min_length", 10)
@@ -1065,7 +1369,7 @@ def process_all_documents(input_dir: str, output_dir: str, config_file: str = No
     )
     
     # 处理目录中的所有文档
-    chunker.process_directory(input_dir, output_dir, save_chunk_index, chunk_index_filename)
+    chunker.process_directory(input_dir, output_dir, save_chunk_index, chunk_index_filename, max_workers)
 
 
 if __name__ == "__main__":